@@ -0,0 +1,173 @@
+"""
+Backup bundles: a live snapshot of plants.db plus the photos it refers to.
+
+A bundle is a gzipped tar holding flora.db, the user's own photos
+(file:// image URLs) under photos/, optionally the downloaded image cache
+under image-cache/, and a manifest.json describing them.
+"""
+import io
+import json
+import os
+import sqlite3
+import tarfile
+import tempfile
+from datetime import datetime
+
+from gi.repository import GLib
+
+from database import MIGRATIONS
+
+BUNDLE_VERSION = 1
+
+# Pages copied per backup step. Between steps the source is unlocked, so
+# writers are never held up for more than one step.
+PAGES_PER_STEP = 256
+
+def image_cache_dir():
+    return os.path.join(GLib.get_user_cache_dir(), "flora", "images")
+
+def photos_dir():
+    return os.path.join(GLib.get_user_data_dir(), "flora", "photos")
+
+def create_backup(db, dest_path, include_image_cache=False):
+    """
+    Writes a bundle to dest_path. Safe to run on any thread while the app
+    keeps reading and writing; the bundle only appears once complete.
+    Returns the manifest.
+    """
+    dest_dir = os.path.dirname(os.path.abspath(dest_path))
+    fd, snapshot = tempfile.mkstemp(suffix=".db", dir=dest_dir)
+    os.close(fd)
+    partial = dest_path + ".part"
+    try:
+        _snapshot_database(db.db_path, snapshot)
+
+        manifest = {
+            "version": BUNDLE_VERSION,
+            "created": datetime.now().isoformat(timespec="seconds"),
+            "photos": {},
+            "image_cache": include_image_cache,
+        }
+        with tarfile.open(partial, "w:gz") as tar:
+            tar.add(snapshot, arcname="flora.db")
+
+            # Photos are read back from the snapshot, so they match the data
+            conn = sqlite3.connect(snapshot)
+            try:
+                urls = [r[0] for r in conn.execute(
+                    "SELECT DISTINCT image_url FROM favorites WHERE image_url LIKE 'file://%'"
+                )]
+                manifest["schema"] = conn.execute("PRAGMA user_version").fetchone()[0]
+            finally:
+                conn.close()
+            for i, url in enumerate(urls):
+                path = url.replace("file://", "")
+                if os.path.isfile(path):
+                    arcname = f"photos/{i}-{os.path.basename(path)}"
+                    tar.add(path, arcname=arcname)
+                    manifest["photos"][arcname] = url
+
+            if include_image_cache and os.path.isdir(image_cache_dir()):
+                for name in os.listdir(image_cache_dir()):
+                    path = os.path.join(image_cache_dir(), name)
+                    if os.path.isfile(path):
+                        tar.add(path, arcname=f"image-cache/{name}")
+
+            data = json.dumps(manifest, indent=2).encode("utf-8")
+            info = tarfile.TarInfo("manifest.json")
+            info.size = len(data)
+            info.mtime = int(datetime.now().timestamp())
+            tar.addfile(info, fileobj=io.BytesIO(data))
+
+        os.replace(partial, dest_path)
+        return manifest
+    finally:
+        for path in (snapshot, partial):
+            if os.path.exists(path):
+                os.remove(path)
+
+def restore_backup(db, src_path):
+    """
+    Replaces the database with the one in the bundle at src_path.
+
+    The snapshot is checked before anything is touched. Photos whose original
+    file is gone are restored under the data directory and their URLs
+    rewritten. Must not be called from the database worker.
+    """
+    db_dir = os.path.dirname(db.db_path)
+    fd, staged = tempfile.mkstemp(suffix=".db", dir=db_dir)
+    os.close(fd)
+    try:
+        with tarfile.open(src_path, "r:*") as tar:
+            manifest = json.load(tar.extractfile("manifest.json"))
+            if manifest.get("version", 0) > BUNDLE_VERSION:
+                raise ValueError("Backup was made by a newer version of Flora")
+
+            with tar.extractfile("flora.db") as src, open(staged, "wb") as dst:
+                while chunk := src.read(1 << 20):
+                    dst.write(chunk)
+            _validate_snapshot(staged)
+
+            moved = {}
+            for arcname, url in manifest.get("photos", {}).items():
+                if os.path.exists(url.replace("file://", "")):
+                    continue
+                os.makedirs(photos_dir(), exist_ok=True)
+                path = os.path.join(photos_dir(), os.path.basename(arcname))
+                _extract_to(tar, arcname, path)
+                moved[url] = "file://" + path
+
+            if manifest.get("image_cache"):
+                os.makedirs(image_cache_dir(), exist_ok=True)
+                for member in tar.getmembers():
+                    if member.isfile() and member.name.startswith("image-cache/"):
+                        name = os.path.basename(member.name)
+                        _extract_to(tar, member.name, os.path.join(image_cache_dir(), name))
+
+        if moved:
+            conn = sqlite3.connect(staged)
+            with conn:
+                conn.executemany(
+                    "UPDATE favorites SET image_url=? WHERE image_url=?",
+                    [(new, old) for old, new in moved.items()]
+                )
+            conn.close()
+
+        db.replace_with(staged)
+        return manifest
+    finally:
+        if os.path.exists(staged):
+            os.remove(staged)
+
+def _snapshot_database(src_path, dest_path):
+    # A dedicated connection, so the copy never waits on the app's own
+    src = sqlite3.connect(src_path)
+    dst = sqlite3.connect(dest_path)
+    try:
+        src.backup(dst, pages=PAGES_PER_STEP, sleep=0.05)
+    finally:
+        dst.close()
+        src.close()
+
+def _validate_snapshot(path):
+    conn = sqlite3.connect(path)
+    try:
+        result = conn.execute("PRAGMA integrity_check").fetchone()[0]
+        if result != "ok":
+            raise ValueError(f"Backup database is damaged: {result}")
+        version = conn.execute("PRAGMA user_version").fetchone()[0]
+        if version > len(MIGRATIONS):
+            raise ValueError("Backup was made by a newer version of Flora")
+        if not conn.execute("SELECT 1 FROM sqlite_master WHERE name='favorites'").fetchone():
+            raise ValueError("Not a Flora database")
+    finally:
+        conn.close()
+
+def _extract_to(tar, arcname, path):
+    # Members are written by name to a path we choose, never extracted as-is
+    src = tar.extractfile(arcname)
+    if src is None:
+        return
+    with src, open(path, "wb") as dst:
+        while chunk := src.read(1 << 20):
+            dst.write(chunk)
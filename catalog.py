@@ -0,0 +1,585 @@
+"""
+The bundled offline plant catalog.
+
+Release builds ship catalog.db, compiled from plants.json at build time
+(see compile_catalog()). It is opened read-only and searched in place, so
+startup doesn't depend on the catalog's size and its pages are shared
+through the page cache by every process that has it open.
+
+Without it, plants.json is parsed once on a background thread and indexed
+in memory. It is only parsed again when its mtime changes.
+
+    python3 catalog.py plants.json catalog.db
+"""
+import bisect
+import json
+import os
+import re
+import sqlite3
+import sys
+import threading
+import time
+import unicodedata
+from urllib.parse import quote
+
+BASE_DIR = os.path.dirname(os.path.abspath(__file__))
+DEFAULT_PATH = os.path.join(BASE_DIR, "plants.json")
+COMPILED_PATH = os.path.join(BASE_DIR, "catalog.db")
+
+# Bumped whenever the compiled schema changes
+COMPILED_VERSION = 2
+
+# A tier with fewer matching names than this is sorted as a whole;
+# larger ones are read in order a (rank, length) group at a time
+SMALL_TIER = 200
+
+# Read the compiled catalog through mmap rather than read() copies
+MMAP_SIZE = 256 * 1024 * 1024
+
+# How often searches may stat() the file to notice edits
+RECHECK_INTERVAL = 2.0
+
+def normalize(text):
+    """Case-, accent- and punctuation-insensitive form of text used for matching."""
+    text = unicodedata.normalize("NFKD", str(text or "")).casefold()
+    text = "".join(c for c in text if not unicodedata.combining(c))
+    return " ".join(re.findall(r"\w+", text))
+
+def trigrams(text):
+    return {text[i:i + 3] for i in range(len(text) - 2)}
+
+def word_tails(name):
+    """
+    name from each of its words but the first on ("b c" and "c" for
+    "a b c"), so a match at the start of a later word, which may run on
+    into the words after it, is a prefix match on one of these.
+    """
+    words = name.split(" ")
+    return [" ".join(words[j:]) for j in range(1, len(words))]
+
+# Searchable fields, best first. A match on a plant's own names outranks
+# the same kind of match on a synonym, and that one a match on its genus
+# or family.
+SEARCH_FIELDS = [
+    ("common_name", 0),
+    ("scientific_name", 0),
+    ("synonyms", 1),
+    ("genus", 2),
+    ("family", 3),
+    ("family_common_name", 3),
+]
+
+# Match kinds, best first
+EXACT, PREFIX, WORD_PREFIX, SUBSTRING = range(4)
+
+def plant_names(plant):
+    """[(field rank, normalized name)] for every searchable name of plant."""
+    names = []
+    for field, rank in SEARCH_FIELDS:
+        values = plant.get(field)
+        for value in values if isinstance(values, list) else [values]:
+            name = normalize(value)
+            if name:
+                names.append((rank, name))
+    return names
+
+class _Index:
+    """
+    Sorted name and word lists plus trigram postings over every searchable
+    name of every plant.
+
+    Matches are gathered best kind first: exact names, name prefixes from
+    the sorted names, word prefixes from the sorted word tails, and only
+    then substrings, from the postings of the query's rarest trigram. Names
+    are numbered in (rank, length, name) order, the order within every
+    kind, and each kind is read in that order, so the search stops as soon
+    as enough plants have been found, however many names match.
+    """
+
+    def __init__(self, plants, mtime):
+        self.plants = plants
+        self.size = len(plants)
+        self.mtime = mtime
+        self.names = [plant_names(p) for p in plants]  # Per plant: [(field rank, normalized name)]
+
+        # (field rank, length, name, plant index), numbered in that order
+        self.entries = sorted(
+            (rank, len(name), name, i) for i, names in enumerate(self.names) for rank, name in names
+        )
+        self.postings = {}     # Trigram -> entry numbers, ascending
+        for n, (rank, length, name, i) in enumerate(self.entries):
+            for gram in trigrams(name):
+                self.postings.setdefault(gram, []).append(n)
+        self.sorted_names = _Prefixes((name, n) for n, (_, _, name, _) in enumerate(self.entries))
+        self.sorted_tails = _Prefixes(
+            (tail, n) for n, (_, _, name, _) in enumerate(self.entries) for tail in word_tails(name)
+        )
+        self.fuzzy = None  # Built after the index goes live, see build_fuzzy()
+
+    def build_fuzzy(self):
+        self.fuzzy = _FuzzyIndex(self.names)
+
+    def get(self, i):
+        return self.plants[i]
+
+    def search(self, needle, limit):
+        """Returns [(sort key, plant index)] for the best limit matches of needle."""
+        best = {}
+
+        def take(numbers, kind):
+            for n in numbers:
+                rank, length, name, i = self.entries[n]
+                if i in best:
+                    continue  # Already found with a better key
+                best[i] = (kind, rank, length, name)
+                if len(best) >= limit:
+                    return
+
+        take(self.sorted_names.equal(needle), EXACT)
+
+        if len(best) < limit:
+            take(self.sorted_names.prefixed(needle, self._group), PREFIX)  # Exact names were all taken above
+
+        if len(best) < limit:
+            take(self.sorted_tails.prefixed(needle, self._group), WORD_PREFIX)
+
+        if len(best) < limit and len(needle) >= 3:
+            postings = [self.postings.get(g, ()) for g in trigrams(needle)]
+            rarest = min(postings, key=len)
+            # Trigrams can all be present without the needle itself being there
+            take((n for n in rarest if needle in self.entries[n][2]), SUBSTRING)
+
+        return sorted((key, i) for i, key in best.items())[:limit]
+
+    def _group(self, n):
+        return self.entries[n][:2]
+
+class _Prefixes:
+    """
+    (string, entry number) pairs, searchable by prefix. Large results are
+    read a (rank, length) group at a time, so they come out in entry
+    number order without sorting every match.
+    """
+
+    def __init__(self, pairs):
+        self.pairs = sorted(pairs)
+        self.groups = None  # Group -> sorted pairs, built on first use
+
+    def equal(self, string):
+        start = bisect.bisect_left(self.pairs, (string,))
+        end = bisect.bisect_left(self.pairs, (string + "\0",))
+        return [n for _, n in self.pairs[start:end]]
+
+    def prefixed(self, prefix, group_of):
+        """Yields the entry numbers of the strings starting with prefix, ascending."""
+        start, end = self._range(self.pairs, prefix)
+        if end - start < SMALL_TIER:
+            yield from sorted(n for _, n in self.pairs[start:end])
+            return
+        if self.groups is None:
+            groups = {}
+            for pair in self.pairs:
+                groups.setdefault(group_of(pair[1]), []).append(pair)
+            self.groups = [groups[g] for g in sorted(groups)]
+        for pairs in self.groups:
+            start, end = self._range(pairs, prefix)
+            yield from sorted(n for _, n in pairs[start:end])
+
+    @staticmethod
+    def _range(pairs, prefix):
+        return bisect.bisect_left(pairs, (prefix,)), bisect.bisect_left(pairs, (_after_prefix(prefix),))
+
+# Typo tolerance. Words shorter than MIN_CORRECTED characters are never
+# corrected: one edit away from them is nearly every short word, so the
+# "correction" would be a guess. Words of up to SHORT_WORD characters
+# allow one edit, longer ones MAX_EDIT_DISTANCE. Only the first PREFIX_LENGTH characters
+# of each word go into the deletion index, which bounds its size; the
+# full words are compared when verifying candidates.
+MAX_EDIT_DISTANCE = 2
+MIN_CORRECTED = 4
+SHORT_WORD = 4
+PREFIX_LENGTH = 7
+
+def _deletes(word, distance):
+    """
+    Every string obtained by removing up to distance characters from word,
+    fewest removals first.
+    """
+    found = dict.fromkeys([word])
+    frontier = [word]
+    for _ in range(distance):
+        frontier = [w[:i] + w[i + 1:] for w in frontier for i in range(len(w))]
+        found.update(dict.fromkeys(frontier))
+    return found
+
+def edit_distance(a, b, limit):
+    """
+    Optimal string alignment distance between a and b (insertions,
+    deletions, substitutions and adjacent transpositions), or limit + 1 if
+    it is larger than limit.
+    """
+    if abs(len(a) - len(b)) > limit:
+        return limit + 1
+    # Shared ends cost nothing; typos usually leave most of a word alone
+    start = 0
+    while start < len(a) and start < len(b) and a[start] == b[start]:
+        start += 1
+    end = 0
+    while end < len(a) - start and end < len(b) - start and a[-1 - end] == b[-1 - end]:
+        end += 1
+    a = a[start:len(a) - end]
+    b = b[start:len(b) - end]
+    if not a or not b:
+        return max(len(a), len(b))
+
+    prev_prev = None
+    prev = list(range(len(b) + 1))
+    for i in range(1, len(a) + 1):
+        cur = [i] + [0] * len(b)
+        for j in range(1, len(b) + 1):
+            cost = 0 if a[i - 1] == b[j - 1] else 1
+            cur[j] = min(prev[j] + 1, cur[j - 1] + 1, prev[j - 1] + cost)
+            if i > 1 and j > 1 and a[i - 1] == b[j - 2] and a[i - 2] == b[j - 1]:
+                cur[j] = min(cur[j], prev_prev[j - 2] + 1)
+        if min(cur) > limit:
+            return limit + 1
+        prev_prev, prev = prev, cur
+    return prev[-1] if prev[-1] <= limit else limit + 1
+
+class _FuzzyIndex:
+    """
+    SymSpell-style deletion index over the distinct words of all names.
+
+    Two words within edit distance d share a string reachable from both by
+    at most d deletions, so a lookup only generates the query's own
+    deletions and checks the words filed under them, rather than comparing
+    against every word in the catalog.
+    """
+
+    def __init__(self, names):
+        self.counts = {}
+        for plant_names in names:
+            for rank, name in plant_names:
+                for word in name.split():
+                    self.counts[word] = self.counts.get(word, 0) + 1
+
+        self.deletes = {}
+        for word in self.counts:
+            for key in _deletes(word[:PREFIX_LENGTH], MAX_EDIT_DISTANCE):
+                self.deletes.setdefault(key, []).append(word)
+
+    def _count(self, word):
+        return self.counts.get(word, 0)
+
+    def _filed_under(self, key):
+        return self.deletes.get(key, ())
+
+    def correct(self, word):
+        """The closest, then most common, catalog word to word, or None."""
+        if self._count(word):
+            return word
+        if len(word) < MIN_CORRECTED:
+            return None
+        limit = 1 if len(word) <= SHORT_WORD else MAX_EDIT_DISTANCE
+        size = len(word)
+        best = None
+        seen = set()
+        for key in _deletes(word[:PREFIX_LENGTH], limit):
+            for candidate in self._filed_under(key):
+                if candidate in seen or abs(len(candidate) - size) > limit:
+                    continue
+                seen.add(candidate)
+                distance = edit_distance(word, candidate, limit)
+                if distance <= limit:
+                    rank = (distance, -self._count(candidate), candidate)
+                    if best is None or rank < best:
+                        best = rank
+                        # Nothing further away can win any more
+                        limit = distance
+        return best[2] if best else None
+
+class _CompiledIndex:
+    """
+    A catalog compiled by compile_catalog(), searched with SQL.
+
+    Gathers matches in the same tiers and order as _Index. Names are
+    numbered in (rank, length, name) order, the order within every tier,
+    so each tier can be read from an index already in that order and only
+    until enough plants have been found, however many names match.
+    """
+
+    def __init__(self, path, mtime):
+        self.path = path
+        self.mtime = mtime
+        self._local = threading.local()
+        version = self.conn.execute("PRAGMA user_version").fetchone()[0]
+        if version != COMPILED_VERSION:
+            raise ValueError(f"unsupported compiled catalog version {version}")
+        self.size = self.conn.execute("SELECT count(*) FROM entries").fetchone()[0]
+        self.groups = self._groups()
+        self.fuzzy = _CompiledFuzzy(self)
+
+    @property
+    def conn(self):
+        """The calling thread's connection; search threads come and go."""
+        conn = getattr(self._local, "conn", None)
+        if conn is None:
+            # immutable: the file never changes while it's installed, so
+            # SQLite can skip locking and change detection entirely
+            uri = f"file:{quote(self.path)}?mode=ro&immutable=1"
+            conn = sqlite3.connect(uri, uri=True, check_same_thread=False)
+            conn.execute(f"PRAGMA mmap_size={MMAP_SIZE}")
+            self._local.conn = conn
+        return conn
+
+    def _groups(self):
+        """The (rank, length) pairs names come in, in order; one index seek each."""
+        groups = []
+        row = self.conn.execute("SELECT rank, length FROM names ORDER BY rank, length LIMIT 1").fetchone()
+        while row is not None:
+            groups.append(row)
+            row = self.conn.execute(
+                "SELECT rank, length FROM names WHERE (rank, length) > (?, ?) ORDER BY rank, length LIMIT 1", row
+            ).fetchone()
+        return groups
+
+    def get(self, i):
+        row = self.conn.execute("SELECT data FROM entries WHERE id = ?", (i,)).fetchone()
+        return json.loads(row[0])
+
+    def search(self, needle, limit):
+        """Returns [(sort key, plant index)] for the best limit matches of needle."""
+        conn = self.conn
+        best = {}
+
+        def take(rows, kind_of):
+            for rank, name, i in rows:
+                if i in best:
+                    continue  # Already found with a better key
+                kind = kind_of(name)
+                if kind is None:
+                    continue
+                best[i] = (kind, rank, len(name), name)
+                if len(best) >= limit:
+                    return
+
+        rows = conn.execute("SELECT rank, name, plant FROM names WHERE name = ? ORDER BY rank, plant", (needle,))
+        take(rows, lambda name: EXACT)
+
+        if len(best) < limit:
+            rows = self._in_order("names", "name", needle)
+            take(rows, lambda name: PREFIX)  # Exact names were all taken above
+
+        if len(best) < limit:
+            rows = self._in_order("name_words", "tail", needle)
+            take(rows, lambda name: WORD_PREFIX)
+
+        if len(best) < limit and len(needle) >= 3:
+            phrase = '"' + needle.replace('"', '""') + '"'
+            # FTS5 yields matches in id order, which is the tier's order
+            rows = conn.execute(
+                "SELECT n.rank, n.name, n.plant FROM name_trigrams t "
+                "JOIN names n ON n.id = t.rowid WHERE name_trigrams MATCH ? ORDER BY t.rowid",
+                (phrase,)
+            )
+            take(rows, lambda name: SUBSTRING if needle in name else None)
+
+        return sorted((key, i) for i, key in best.items())[:limit]
+
+    def _in_order(self, table, column, prefix):
+        """
+        Yields (rank, name, plant) for the rows of table whose column starts
+        with prefix, in (rank, length, name, plant) order.
+        """
+        sql = f"SELECT rank, name, plant FROM {table} WHERE {column} >= ? AND {column} < ?"
+        params = (prefix, _after_prefix(prefix))
+        rows = self.conn.execute(sql + " LIMIT ?", params + (SMALL_TIER,)).fetchall()
+        if len(rows) < SMALL_TIER:
+            yield from sorted(rows, key=lambda row: (row[0], len(row[1]), row[1], row[2]))
+            return
+        for group in self.groups:
+            yield from self.conn.execute(sql + " AND rank = ? AND length = ? ORDER BY name, plant", params + group)
+
+class _CompiledFuzzy(_FuzzyIndex):
+    """The deletion index of a compiled catalog, looked up in place."""
+
+    def __init__(self, index):
+        self.index = index
+
+    def _count(self, word):
+        row = self.index.conn.execute("SELECT count FROM vocabulary WHERE word = ?", (word,)).fetchone()
+        return row[0] if row else 0
+
+    def _filed_under(self, key):
+        row = self.index.conn.execute("SELECT words FROM vocabulary_deletes WHERE key = ?", (key,)).fetchone()
+        return row[0].split(" ") if row else ()
+
+def _after_prefix(prefix):
+    """The smallest string greater than every string starting with prefix."""
+    return prefix[:-1] + chr(ord(prefix[-1]) + 1)
+
+def compile_catalog(source, dest):
+    """
+    Compiles the plants.json at source into a read-only catalog at dest.
+    Returns the number of plants.
+    """
+    with open(source, 'r', encoding='utf-8') as f:
+        plants = json.load(f).get('data', [])
+
+    part = dest + ".part"
+    if os.path.exists(part):
+        os.remove(part)
+    conn = sqlite3.connect(part)
+    try:
+        conn.executescript("""
+            PRAGMA journal_mode=OFF;
+            PRAGMA synchronous=OFF;
+            CREATE TABLE entries (id INTEGER PRIMARY KEY, data TEXT NOT NULL);
+            CREATE TABLE names (id INTEGER PRIMARY KEY, name TEXT NOT NULL, rank INTEGER NOT NULL, length INTEGER NOT NULL, plant INTEGER NOT NULL);
+            CREATE TABLE name_words (tail TEXT NOT NULL, rank INTEGER NOT NULL, length INTEGER NOT NULL, name TEXT NOT NULL, plant INTEGER NOT NULL);
+            CREATE TABLE vocabulary (word TEXT PRIMARY KEY, count INTEGER NOT NULL) WITHOUT ROWID;
+            CREATE TABLE vocabulary_deletes (key TEXT PRIMARY KEY, words TEXT NOT NULL) WITHOUT ROWID;
+            CREATE VIRTUAL TABLE name_trigrams USING fts5(name, content='names', content_rowid='id', tokenize='trigram');
+        """)
+
+        all_names = []
+        for i, p in enumerate(plants):
+            all_names.append(plant_names(p))
+            conn.execute("INSERT INTO entries VALUES (?, ?)", (i, json.dumps(p, separators=(",", ":"))))
+
+        # Numbered in the order matches rank in, see _CompiledIndex
+        rows = sorted((rank, len(name), name, i) for i, names in enumerate(all_names) for rank, name in names)
+        conn.executemany(
+            "INSERT INTO names VALUES (?, ?, ?, ?, ?)",
+            ((n, name, rank, length, i) for n, (rank, length, name, i) in enumerate(rows))
+        )
+        conn.executemany(
+            "INSERT INTO name_words VALUES (?, ?, ?, ?, ?)",
+            ((tail, rank, length, name, i) for rank, length, name, i in rows for tail in word_tails(name))
+        )
+
+        fuzzy = _FuzzyIndex(all_names)
+        conn.executemany("INSERT INTO vocabulary VALUES (?, ?)", fuzzy.counts.items())
+        conn.executemany(
+            "INSERT INTO vocabulary_deletes VALUES (?, ?)",
+            ((key, " ".join(words)) for key, words in fuzzy.deletes.items())
+        )
+
+        conn.executescript(f"""
+            CREATE INDEX idx_names_name ON names(name, rank, plant);
+            CREATE INDEX idx_names_order ON names(rank, length, name, plant);
+            CREATE INDEX idx_name_words_tail ON name_words(tail);
+            CREATE INDEX idx_name_words_order ON name_words(rank, length, tail);
+            INSERT INTO name_trigrams(name_trigrams) VALUES ('rebuild');
+            INSERT INTO name_trigrams(name_trigrams) VALUES ('optimize');
+            ANALYZE;
+            PRAGMA user_version={COMPILED_VERSION};
+        """)
+        conn.commit()
+        conn.execute("VACUUM")
+    finally:
+        conn.close()
+    os.replace(part, dest)
+    return len(plants)
+
+class Catalog:
+    def __init__(self, path=None):
+        if path is None:
+            path = COMPILED_PATH if os.path.exists(COMPILED_PATH) else DEFAULT_PATH
+        self.path = path
+        self._index = _Index([], None)
+        self._loaded = threading.Event()
+        self._reload_lock = threading.Lock()
+        self._last_check = 0.0
+
+    def load_async(self):
+        """Starts loading the catalog; searches wait for it to finish."""
+        threading.Thread(target=self._reload, name="flora-catalog", daemon=True).start()
+
+    def search(self, query, limit=50):
+        """
+        Returns up to limit catalog entries matching query, best first:
+        exact names, then name prefixes, then word prefixes, then any
+        substring. If nothing matches, misspelled words are corrected and
+        the search is retried. Blocks until the catalog is loaded.
+        """
+        self._loaded.wait()
+        self._check_for_changes()
+
+        needle = normalize(query)
+        if not needle:
+            return []
+        index = self._index
+        limit = limit or index.size
+        found = index.search(needle, limit)
+        if not found:
+            corrected = self._correct(index, needle)
+            if corrected:
+                found = index.search(corrected, limit)
+        return [index.get(i) for _, i in found]
+
+    def suggest(self, query):
+        """The query with misspelled words corrected, or None if there's nothing to correct."""
+        self._loaded.wait()
+        return self._correct(self._index, normalize(query))
+
+    def _correct(self, index, needle):
+        if index.fuzzy is None:
+            return None  # Still being built
+        words = needle.split()
+        corrected = [index.fuzzy.correct(w) or w for w in words]
+        return " ".join(corrected) if corrected != words else None
+
+    def _check_for_changes(self):
+        now = time.monotonic()
+        if now - self._last_check < RECHECK_INTERVAL:
+            return
+        self._last_check = now
+        if self._mtime() != self._index.mtime:
+            # Keep serving the old index while the new one is built
+            self.load_async()
+
+    def _mtime(self):
+        try:
+            return os.stat(self.path).st_mtime_ns
+        except OSError:
+            return None
+
+    def _reload(self):
+        if not self._reload_lock.acquire(blocking=False):
+            return  # Already reloading
+        mtime = self._mtime()
+        try:
+            if mtime is None:
+                print(f"Plant catalog not found at {self.path}")
+                self._index = _Index([], None)
+            elif self.path.endswith(".db"):
+                if mtime != self._index.mtime:
+                    self._index = _CompiledIndex(self.path, mtime)
+            elif mtime != self._index.mtime:
+                with open(self.path, 'r', encoding='utf-8') as f:
+                    plants = json.load(f).get('data', [])
+                # Swapped in whole, so searches never see a half-built index
+                index = _Index(plants, mtime)
+                self._index = index
+                self._loaded.set()
+                index.build_fuzzy()
+        except Exception as e:
+            print(f"Catalog load error: {e}")
+            # Keep the old entries, and don't retry until the file changes again
+            self._index.mtime = mtime
+        finally:
+            self._reload_lock.release()
+            self._loaded.set()
+
+def main(argv):
+    """Entry point for `python3 catalog.py SOURCE.json DEST.db`, run at build time."""
+    if len(argv) != 2:
+        print("usage: catalog.py SOURCE.json DEST.db", file=sys.stderr)
+        return 2
+    count = compile_catalog(*argv)
+    print(f"Compiled {count} plants into {argv[1]}", file=sys.stderr)
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main(sys.argv[1:]))
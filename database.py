@@ -1,216 +1,904 @@
+import functools
 import sqlite3
 import os
+import queue
+import re
+import threading
+from collections import OrderedDict
+from concurrent.futures import Future
+from contextlib import contextmanager
+from datetime import date, datetime, timedelta
+from dataclasses import fields
 from gi.repository import GLib
 
+from models import Plant, Reminder, JournalEntry, Layout, LayoutItem, row_factory
+
+FAVORITE_COLUMNS = [f.name for f in fields(Plant)]
+
+# Computed favorites columns. last_watered is the epoch of the newest
+# watering event, or None if the plant was never watered. Triggers on
+# care_events keep it in favorites.last_watered_epoch (see
+# _migrate_last_watered_epoch), so it can be indexed and sorted on.
+_LAST_WATERED_SQL = "f.last_watered_epoch"
+
+# Selects a Plant from favorites aliased as f
+_PLANT_SQL = ", ".join(f"{_LAST_WATERED_SQL} AS last_watered" if c == "last_watered" else f"f.{c}" for c in FAVORITE_COLUMNS)
+
+# Markers search_journal() puts around matched terms in snippets. They are
+# control characters so the UI can escape the text before turning them
+# into markup.
+SNIPPET_START = "\x02"
+SNIPPET_END = "\x03"
+
+# Reminder due dates are stored as Julian day numbers: plain integers that
+# sort, compare and index like the dates they stand for.
+_JULIAN_DAY_OFFSET = 1721425
+
+def to_julian_day(value):
+    """Converts a date or a "YYYY-MM-DD" string to a Julian day number.
+
+    Raises ValueError for anything that isn't a real calendar date.
+    """
+    if isinstance(value, str):
+        value = date.fromisoformat(value.strip())
+    if not isinstance(value, date):
+        raise ValueError(f"Not a date: {value!r}")
+    return value.toordinal() + _JULIAN_DAY_OFFSET
+
+def from_julian_day(day):
+    return date.fromordinal(day - _JULIAN_DAY_OFFSET)
+
+def fts_query(text):
+    """Turns free text into an FTS5 query matching every word as a prefix."""
+    words = re.findall(r"\w+", text)
+    return " ".join(f'"{w}"*' for w in words)
+
+def _table_columns(conn, table):
+    return {row[1] for row in conn.execute(f"PRAGMA table_info({table})")}
+
+def _migrate_base_schema(conn):
+    """Creates the original schema, upgrading files from before versioning."""
+    conn.execute('''
+        CREATE TABLE IF NOT EXISTS favorites (
+            id INTEGER PRIMARY KEY,
+            common_name TEXT,
+            scientific_name TEXT,
+            family TEXT,
+            genus TEXT,
+            year TEXT,
+            bibliography TEXT,
+            edible TEXT,
+            vegetable TEXT,
+            image_url TEXT,
+            habit TEXT,
+            harvest TEXT,
+            light TEXT,
+            notes TEXT,
+            added_date DATE DEFAULT (date('now')),
+            last_watered TEXT
+        )
+    ''')
+
+    # Older files predate these columns
+    existing = _table_columns(conn, "favorites")
+    for col in ['family', 'genus', 'year', 'bibliography', 'edible', 'vegetable']:
+        if col not in existing:
+            conn.execute(f"ALTER TABLE favorites ADD COLUMN {col} TEXT")
+
+    conn.execute('''
+        CREATE TABLE IF NOT EXISTS reminders (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            task TEXT,
+            due_date DATE,
+            completed INTEGER DEFAULT 0
+        )
+    ''')
+
+    conn.execute('''
+        CREATE TABLE IF NOT EXISTS journal (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            title TEXT,
+            content TEXT,
+            date DATE DEFAULT (date('now'))
+        )
+    ''')
+    if "title" not in _table_columns(conn, "journal"):
+        conn.execute("ALTER TABLE journal ADD COLUMN title TEXT")
+
+    # The grid-based layouts schema (with width/height) was replaced by
+    # collections; its data can't be carried over.
+    if "width" in _table_columns(conn, "layouts"):
+        conn.execute("DROP TABLE IF EXISTS layout_items")
+        conn.execute("DROP TABLE layouts")
+
+    conn.execute('''
+        CREATE TABLE IF NOT EXISTS layouts (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            name TEXT,
+            type TEXT,
+            created_date DATE DEFAULT (date('now'))
+        )
+    ''')
+
+    conn.execute('''
+        CREATE TABLE IF NOT EXISTS layout_items (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            layout_id INTEGER,
+            plant_id INTEGER,
+            FOREIGN KEY(layout_id) REFERENCES layouts(id) ON DELETE CASCADE
+        )
+    ''')
+
+def _migrate_add_indexes(conn):
+    """Indexes for the lookups and sort orders the views run on every refresh."""
+    conn.execute("CREATE INDEX IF NOT EXISTS idx_layout_items_plant ON layout_items(plant_id)")
+    conn.execute("CREATE INDEX IF NOT EXISTS idx_layout_items_layout ON layout_items(layout_id, plant_id)")
+    conn.execute("CREATE INDEX IF NOT EXISTS idx_reminders_pending ON reminders(completed, due_date)")
+    conn.execute("CREATE INDEX IF NOT EXISTS idx_favorites_last_watered ON favorites(last_watered)")
+    conn.execute("CREATE INDEX IF NOT EXISTS idx_favorites_common_name ON favorites(common_name)")
+    conn.execute("CREATE INDEX IF NOT EXISTS idx_journal_date ON journal(date)")
+    conn.execute("CREATE INDEX IF NOT EXISTS idx_layouts_created ON layouts(created_date)")
+
+def _migrate_journal_fts(conn):
+    """Full-text index over journal entries, kept in sync by triggers."""
+    conn.execute('''
+        CREATE VIRTUAL TABLE journal_fts USING fts5(
+            title, content,
+            content='journal', content_rowid='id',
+            tokenize='unicode61 remove_diacritics 2'
+        )
+    ''')
+    conn.execute('''
+        CREATE TRIGGER journal_fts_insert AFTER INSERT ON journal BEGIN
+            INSERT INTO journal_fts(rowid, title, content) VALUES (new.id, new.title, new.content);
+        END
+    ''')
+    conn.execute('''
+        CREATE TRIGGER journal_fts_delete AFTER DELETE ON journal BEGIN
+            INSERT INTO journal_fts(journal_fts, rowid, title, content) VALUES ('delete', old.id, old.title, old.content);
+        END
+    ''')
+    conn.execute('''
+        CREATE TRIGGER journal_fts_update AFTER UPDATE OF title, content ON journal BEGIN
+            INSERT INTO journal_fts(journal_fts, rowid, title, content) VALUES ('delete', old.id, old.title, old.content);
+            INSERT INTO journal_fts(rowid, title, content) VALUES (new.id, new.title, new.content);
+        END
+    ''')
+    conn.execute("INSERT INTO journal_fts(journal_fts) VALUES ('rebuild')")
+
+FAVORITE_SEARCH_COLUMNS = ["common_name", "scientific_name", "family", "genus", "notes"]
+
+def _migrate_favorites_fts(conn):
+    """Trigram index over the searchable favorites columns, for substring search."""
+    cols = ", ".join(FAVORITE_SEARCH_COLUMNS)
+    new_cols = ", ".join("new." + c for c in FAVORITE_SEARCH_COLUMNS)
+    old_cols = ", ".join("old." + c for c in FAVORITE_SEARCH_COLUMNS)
+    conn.execute(f'''
+        CREATE VIRTUAL TABLE favorites_fts USING fts5(
+            {cols},
+            content='favorites', content_rowid='id',
+            tokenize='trigram'
+        )
+    ''')
+    conn.execute(f'''
+        CREATE TRIGGER favorites_fts_insert AFTER INSERT ON favorites BEGIN
+            INSERT INTO favorites_fts(rowid, {cols}) VALUES (new.id, {new_cols});
+        END
+    ''')
+    conn.execute(f'''
+        CREATE TRIGGER favorites_fts_delete AFTER DELETE ON favorites BEGIN
+            INSERT INTO favorites_fts(favorites_fts, rowid, {cols}) VALUES ('delete', old.id, {old_cols});
+        END
+    ''')
+    # Only edits to indexed columns touch the index; watering a plant doesn't
+    conn.execute(f'''
+        CREATE TRIGGER favorites_fts_update AFTER UPDATE OF {cols} ON favorites BEGIN
+            INSERT INTO favorites_fts(favorites_fts, rowid, {cols}) VALUES ('delete', old.id, {old_cols});
+            INSERT INTO favorites_fts(rowid, {cols}) VALUES (new.id, {new_cols});
+        END
+    ''')
+    conn.execute("INSERT INTO favorites_fts(favorites_fts) VALUES ('rebuild')")
+
+def _migrate_care_events(conn):
+    """Moves watering history out of favorites.last_watered into an event log.
+
+    The old column held free text in two formats ("%Y-%m-%d" from the
+    dashboard, "%Y-%m-%d %H:%M" from the details page), both local time.
+    """
+    conn.execute('''
+        CREATE TABLE care_events (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            plant_id INTEGER NOT NULL,
+            kind TEXT NOT NULL,
+            ts_epoch INTEGER NOT NULL
+        )
+    ''')
+    # Covers "last event per plant" (a seek to the end of a plant's range)
+    # and counts over a time window without touching the table.
+    conn.execute("CREATE INDEX idx_care_events_plant ON care_events(plant_id, kind, ts_epoch)")
+    conn.execute('''
+        INSERT INTO care_events (plant_id, kind, ts_epoch)
+        SELECT id, 'water', CAST(strftime('%s', last_watered, 'utc') AS INTEGER)
+        FROM favorites
+        WHERE strftime('%s', last_watered, 'utc') IS NOT NULL
+    ''')
+    conn.execute("DROP INDEX IF EXISTS idx_favorites_last_watered")
+    conn.execute("ALTER TABLE favorites DROP COLUMN last_watered")
+
+def _migrate_reminder_due_days(conn):
+    """Replaces the free-text reminders.due_date with an indexed due_day.
+
+    Dates that don't parse are moved to the day of the migration, so the
+    reminders still show up where they can be fixed.
+    """
+    conn.execute("ALTER TABLE reminders ADD COLUMN due_day INTEGER")
+    today = to_julian_day(date.today())
+    for r_id, due_date in conn.execute("SELECT id, due_date FROM reminders").fetchall():
+        try:
+            day = to_julian_day(str(due_date))
+        except ValueError:
+            print(f"Reminder {r_id} had an invalid due date {due_date!r}, moved to today")
+            day = today
+        conn.execute("UPDATE reminders SET due_day=? WHERE id=?", (day, r_id))
+    conn.execute("DROP INDEX IF EXISTS idx_reminders_pending")
+    conn.execute("ALTER TABLE reminders DROP COLUMN due_date")
+    # Serves the (due_day, id) ordering and every date-range query
+    conn.execute("CREATE INDEX idx_reminders_due ON reminders(completed, due_day)")
+
+def _migrate_last_watered_epoch(conn):
+    """Denormalizes the newest watering into an indexed favorites column.
+
+    Ranking plants by a per-row MAX() over care_events can't use an index,
+    so "needs water" scanned and sorted every favorite. care_events stays
+    the source of truth; triggers keep the column in step with it.
+    """
+    conn.execute("ALTER TABLE favorites ADD COLUMN last_watered_epoch INTEGER")
+    conn.execute('''
+        UPDATE favorites SET last_watered_epoch = (
+            SELECT MAX(ts_epoch) FROM care_events c WHERE c.plant_id = favorites.id AND c.kind = 'water'
+        )
+    ''')
+    # NULLs sort first, so never-watered plants lead this index's order
+    conn.execute("CREATE INDEX idx_favorites_last_watered_epoch ON favorites(last_watered_epoch)")
+    conn.execute('''
+        CREATE TRIGGER care_events_water_insert AFTER INSERT ON care_events WHEN new.kind = 'water' BEGIN
+            UPDATE favorites SET last_watered_epoch = new.ts_epoch
+            WHERE id = new.plant_id AND (last_watered_epoch IS NULL OR last_watered_epoch < new.ts_epoch);
+        END
+    ''')
+    conn.execute('''
+        CREATE TRIGGER care_events_water_delete AFTER DELETE ON care_events WHEN old.kind = 'water' BEGIN
+            UPDATE favorites SET last_watered_epoch = (
+                SELECT MAX(ts_epoch) FROM care_events WHERE plant_id = old.plant_id AND kind = 'water'
+            ) WHERE id = old.plant_id;
+        END
+    ''')
+
+# Schema migrations, applied in order. The database's user_version is the
+# number of entries already applied, so never reorder or edit shipped ones;
+# append a new function instead.
+MIGRATIONS = [
+    _migrate_base_schema,
+    _migrate_add_indexes,
+    _migrate_journal_fts,
+    _migrate_favorites_fts,
+    _migrate_care_events,
+    _migrate_reminder_due_days,
+    _migrate_last_watered_epoch,
+]
+
+# Cached reads kept at most; the least recently used are dropped first
+MAX_CACHE_ENTRIES = 256
+
+def _cached(*tables):
+    """Memoizes a read method until any of the tables it reads is written.
+
+    Entries are keyed by method and arguments and stamped with the tables'
+    write generations, so invalidation is just a counter bump. Stale and
+    rarely used entries age out once MAX_CACHE_ENTRIES is reached. Callers
+    share the cached result and must not mutate it.
+    """
+    def decorator(method):
+        @functools.wraps(method)
+        def wrapper(self, *args, **kwargs):
+            key = (method.__name__, args, tuple(sorted(kwargs.items())))
+            with self._cache_lock:
+                # Stamp with the generations seen before querying, so a write
+                # racing with the query leaves a stale stamp, not stale data.
+                stamp = (self._cache_epoch,) + tuple(self._generations.get(t, 0) for t in tables)
+                hit = self._cache.get(key)
+                if hit is not None and hit[0] == stamp:
+                    self._cache.move_to_end(key)
+                    return hit[1]
+            result = method(self, *args, **kwargs)
+            with self._cache_lock:
+                self._cache[key] = (stamp, result)
+                self._cache.move_to_end(key)
+                while len(self._cache) > MAX_CACHE_ENTRIES:
+                    self._cache.popitem(last=False)
+            return result
+        return wrapper
+    return decorator
+
+def _invalidates(*tables):
+    """Marks a write method as changing tables, invalidating cached reads of them."""
+    def decorator(method):
+        @functools.wraps(method)
+        def wrapper(self, *args, **kwargs):
+            try:
+                return method(self, *args, **kwargs)
+            finally:
+                self._bump_generations(tables)
+        return wrapper
+    return decorator
+
+def _deliver(callback, result):
+    callback(result)
+    return False
+
 class Database:
     def __init__(self):
         data_dir = os.path.join(GLib.get_user_data_dir(), "flora")
         if not os.path.exists(data_dir):
             os.makedirs(data_dir)
         self.db_path = os.path.join(data_dir, "plants.db")
-        self.conn = sqlite3.connect(self.db_path, check_same_thread=False)
-        self.cursor = self.conn.cursor()
+
+        # Each thread gets its own connection. In WAL mode readers work from a
+        # snapshot and never wait on the writer; writers are serialized here
+        # so they don't have to spin on SQLITE_BUSY.
+        self._local = threading.local()
+        self._connections = {}
+        self._connections_lock = threading.Lock()
+        self._write_lock = threading.RLock()
+
+        # Read-through cache, see _cached()
+        self._cache = OrderedDict()
+        self._generations = {}
+        self._cache_epoch = 0
+        self._cache_lock = threading.Lock()
+
+        # Background queries run in submission order on a single worker
+        self._jobs = queue.Queue()
+        self._worker = None
+
         self._init_db()
 
-    def _init_db(self):
-        self.cursor.execute('''
-            CREATE TABLE IF NOT EXISTS favorites (
-                id INTEGER PRIMARY KEY,
-                common_name TEXT,
-                scientific_name TEXT,
-                family TEXT,
-                genus TEXT,
-                year TEXT,
-                bibliography TEXT,
-                edible TEXT,
-                vegetable TEXT,
-                image_url TEXT,
-                habit TEXT,
-                harvest TEXT,
-                light TEXT,
-                notes TEXT,
-                added_date DATE DEFAULT (date('now')),
-                last_watered TEXT
-            )
-        ''')
-        
-        # Migration: Add new columns if they don't exist
-        columns_to_add = ['family', 'genus', 'year', 'bibliography', 'edible', 'vegetable']
-        for col in columns_to_add:
+    def _connect(self):
+        conn = sqlite3.connect(self.db_path, timeout=30, check_same_thread=False)
+        # Only takes effect on a new, empty file; older files are converted
+        # once by enable_incremental_vacuum()
+        conn.execute("PRAGMA auto_vacuum=INCREMENTAL")
+        conn.execute("PRAGMA journal_mode=WAL")
+        conn.execute("PRAGMA synchronous=NORMAL")
+        return conn
+
+    @property
+    def conn(self):
+        """The calling thread's connection, opened on first use."""
+        conn = getattr(self._local, "conn", None)
+        if conn is None:
+            conn = self._connect()
+            self._local.conn = conn
+            with self._connections_lock:
+                # Forget connections owned by threads that have exited
+                for thread in [t for t in self._connections if not t.is_alive()]:
+                    self._connections.pop(thread).close()
+                self._connections[threading.current_thread()] = conn
+        return conn
+
+    def _query(self, model, sql, params=()):
+        """Runs a read whose rows are built into model records."""
+        cursor = self.conn.cursor()
+        cursor.row_factory = row_factory(model)
+        return cursor.execute(sql, params)
+
+    def submit(self, func, *args, callback=None, error_callback=None):
+        """Runs func(*args) on the database worker thread.
+
+        Jobs run one at a time in the order they were submitted, so a write
+        queued before a read is always visible to it. If given, callback
+        receives the result (or error_callback the exception) on the GTK
+        main loop. Returns a concurrent.futures.Future, which can also be
+        awaited through asyncio.wrap_future().
+        """
+        future = Future()
+        with self._connections_lock:
+            if self._worker is None or not self._worker.is_alive():
+                self._worker = threading.Thread(target=self._run_jobs, name="flora-db", daemon=True)
+                self._worker.start()
+        self._jobs.put((future, func, args, callback, error_callback))
+        return future
+
+    def _run_jobs(self):
+        while True:
+            job = self._jobs.get()
+            if job is None:
+                return
+            future, func, args, callback, error_callback = job
+            if not future.set_running_or_notify_cancel():
+                continue
             try:
-                self.cursor.execute(f"ALTER TABLE favorites ADD COLUMN {col} TEXT")
-            except sqlite3.OperationalError:
-                pass  # Column likely exists
-
-        self.cursor.execute('''
-            CREATE TABLE IF NOT EXISTS reminders (
-                id INTEGER PRIMARY KEY AUTOINCREMENT,
-                task TEXT,
-                due_date DATE,
-                completed INTEGER DEFAULT 0
-            )
-        ''')
-        
-        # New Journal Table
-        self.cursor.execute('''
-            CREATE TABLE IF NOT EXISTS journal (
-                id INTEGER PRIMARY KEY AUTOINCREMENT,
-                title TEXT,
-                content TEXT,
-                date DATE DEFAULT (date('now'))
-            )
-        ''')
+                result = func(*args)
+            except Exception as e:
+                print(f"Database job error: {e}")
+                future.set_exception(e)
+                if error_callback:
+                    GLib.idle_add(_deliver, error_callback, e)
+            else:
+                future.set_result(result)
+                if callback:
+                    GLib.idle_add(_deliver, callback, result)
 
-        # Migration: Add title column to journal if it doesn't exist
-        try:
-            self.cursor.execute("ALTER TABLE journal ADD COLUMN title TEXT")
-        except sqlite3.OperationalError:
-            pass # Column likely exists
+    def _bump_generations(self, tables):
+        with self._cache_lock:
+            for t in tables:
+                self._generations[t] = self._generations.get(t, 0) + 1
+        # Other threads can still read the pre-transaction snapshot until the
+        # outermost transaction commits, so bump again at that point.
+        if getattr(self._local, "depth", 0):
+            self._local.dirty.update(tables)
 
-        # Layouts / Collections
-        # Check for old schema
-        try:
-            self.cursor.execute("SELECT width FROM layouts LIMIT 1")
-            # If successful, we have the old schema. Drop it.
-            self.cursor.execute("DROP TABLE layout_items")
-            self.cursor.execute("DROP TABLE layouts")
-        except sqlite3.OperationalError:
-            # Table doesn't exist or column doesn't exist (already migrated)
-            pass
-
-        self.cursor.execute('''
-            CREATE TABLE IF NOT EXISTS layouts (
-                id INTEGER PRIMARY KEY AUTOINCREMENT,
-                name TEXT,
-                type TEXT,
-                created_date DATE DEFAULT (date('now'))
-            )
-        ''')
-
-        self.cursor.execute('''
-            CREATE TABLE IF NOT EXISTS layout_items (
-                id INTEGER PRIMARY KEY AUTOINCREMENT,
-                layout_id INTEGER,
-                plant_id INTEGER,
-                FOREIGN KEY(layout_id) REFERENCES layouts(id) ON DELETE CASCADE
-            )
-        ''')
-        
-        self.conn.commit()
+    def invalidate_cache(self, tables=None):
+        """Drops cached reads, e.g. after the file was changed externally.
+
+        With tables, only reads of those tables are invalidated, as for
+        writes made directly on a connection rather than through a method.
+        """
+        if tables is not None:
+            self._bump_generations(tables)
+            return
+        with self._cache_lock:
+            self._cache.clear()
+            self._cache_epoch += 1
+
+    def close(self):
+        """Stops the worker and closes every connection opened by this Database."""
+        if self._worker is not None:
+            self._jobs.put(None)
+            self._worker.join()
+            self._worker = None
+        self._close_connections()
+
+    def _close_connections(self):
+        with self._connections_lock:
+            for conn in self._connections.values():
+                conn.close()
+            self._connections.clear()
+        self._local = threading.local()
+
+    def replace_with(self, path):
+        """Atomically swaps the database file for path, e.g. to restore a backup.
+
+        Every connection is closed and the old write-ahead log removed first,
+        so none of its pages can be applied to the new file. The new file is
+        then migrated like any other. Must not be called from the worker.
+        """
+        self.close()
+        with self._write_lock:
+            # A job may have slipped in since close() drained the worker
+            self._close_connections()
+            for suffix in ("-wal", "-shm"):
+                try:
+                    os.remove(self.db_path + suffix)
+                except FileNotFoundError:
+                    pass
+            os.replace(path, self.db_path)
+            self._init_db()
+        self.invalidate_cache()
 
+    @contextmanager
+    def transaction(self):
+        """Groups every write made inside the block into a single commit.
+
+        Transactions nest: only the outermost block commits, and an
+        exception escaping any level rolls the whole group back.
+        """
+        with self._write_lock:
+            conn = self.conn
+            depth = getattr(self._local, "depth", 0)
+            if depth == 0:
+                self._local.dirty = set()
+            self._local.depth = depth + 1
+            try:
+                yield conn
+                if depth == 0:
+                    conn.commit()
+            except BaseException:
+                if depth == 0:
+                    conn.rollback()
+                raise
+            finally:
+                self._local.depth = depth
+                if depth == 0 and self._local.dirty:
+                    self._bump_generations(self._local.dirty)
+
+    def _init_db(self):
+        """Brings the schema up to date, one numbered migration at a time.
+
+        PRAGMA user_version records the last migration applied, so a current
+        database costs a single pragma read at startup. Each migration runs
+        in its own transaction together with the version bump, so a failure
+        leaves the file at the previous version rather than half-migrated.
+        """
+        conn = self.conn
+        if conn.execute("PRAGMA user_version").fetchone()[0] >= len(MIGRATIONS):
+            return
+
+        with self._write_lock:
+            while True:
+                conn.execute("BEGIN IMMEDIATE")
+                try:
+                    # Re-read under the write lock in case another instance
+                    # migrated the file in the meantime.
+                    version = conn.execute("PRAGMA user_version").fetchone()[0]
+                    if version >= len(MIGRATIONS):
+                        conn.rollback()
+                        return
+                    MIGRATIONS[version](conn)
+                    conn.execute(f"PRAGMA user_version = {version + 1}")
+                    conn.commit()
+                except BaseException:
+                    conn.rollback()
+                    raise
+
+    @_invalidates("favorites")
     def add_favorite(self, p_id, common, sci, family, genus, year, bib, edible, veg, img, habit, harvest, light, notes):
         try:
-            self.cursor.execute(
-                "INSERT INTO favorites (id, common_name, scientific_name, family, genus, year, bibliography, edible, vegetable, image_url, habit, harvest, light, notes) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)",
-                (p_id, common, sci, family, genus, year, bib, edible, veg, img, habit, harvest, light, notes)
-            )
-            self.conn.commit()
+            with self.transaction() as conn:
+                conn.execute(
+                    "INSERT INTO favorites (id, common_name, scientific_name, family, genus, year, bibliography, edible, vegetable, image_url, habit, harvest, light, notes) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)",
+                    (p_id, common, sci, family, genus, year, bib, edible, veg, img, habit, harvest, light, notes)
+                )
             return True
         except sqlite3.IntegrityError:
             return False
 
+    @_invalidates("favorites", "layout_items", "care_events")
     def remove_favorite(self, p_id):
-        self.cursor.execute("DELETE FROM favorites WHERE id=?", (p_id,))
-        self.cursor.execute("DELETE FROM layout_items WHERE plant_id=?", (p_id,))
-        self.conn.commit()
+        with self.transaction() as conn:
+            conn.execute("DELETE FROM favorites WHERE id=?", (p_id,))
+            conn.execute("DELETE FROM layout_items WHERE plant_id=?", (p_id,))
+            conn.execute("DELETE FROM care_events WHERE plant_id=?", (p_id,))
         return True
 
+    @_invalidates("favorites")
     def update_favorite(self, p_id, common, sci, family, genus, year, bib, edible, veg, habit, harvest, light, notes, image_url=None):
-        if image_url:
-            self.cursor.execute(
-                "UPDATE favorites SET common_name=?, scientific_name=?, family=?, genus=?, year=?, bibliography=?, edible=?, vegetable=?, habit=?, harvest=?, light=?, notes=?, image_url=? WHERE id=?",
-                (common, sci, family, genus, year, bib, edible, veg, habit, harvest, light, notes, image_url, p_id)
-            )
+        with self.transaction() as conn:
+            if image_url:
+                conn.execute(
+                    "UPDATE favorites SET common_name=?, scientific_name=?, family=?, genus=?, year=?, bibliography=?, edible=?, vegetable=?, habit=?, harvest=?, light=?, notes=?, image_url=? WHERE id=?",
+                    (common, sci, family, genus, year, bib, edible, veg, habit, harvest, light, notes, image_url, p_id)
+                )
+            else:
+                conn.execute(
+                    "UPDATE favorites SET common_name=?, scientific_name=?, family=?, genus=?, year=?, bibliography=?, edible=?, vegetable=?, habit=?, harvest=?, light=?, notes=? WHERE id=?",
+                    (common, sci, family, genus, year, bib, edible, veg, habit, harvest, light, notes, p_id)
+                )
+        return True
+
+    @_cached("favorites", "care_events")
+    def get_favorites(self):
+        return self._query(Plant, f"SELECT {_PLANT_SQL} FROM favorites f").fetchall()
+
+    @_cached("favorites", "care_events")
+    def get_favorites_page(self, after_id=None, limit=50):
+        """Up to limit favorites with id greater than after_id, in id order."""
+        return self._query(
+            Plant, f"SELECT {_PLANT_SQL} FROM favorites f WHERE id > ? ORDER BY id LIMIT ?",
+            (after_id if after_id is not None else -1, limit)
+        ).fetchall()
+
+    @_cached("favorites", "care_events")
+    def get_favorite(self, p_id):
+        """The saved Plant with id p_id, or None if it isn't in the garden."""
+        return self._query(Plant, f"SELECT {_PLANT_SQL} FROM favorites f WHERE id=?", (p_id,)).fetchone()
+
+    @_cached("favorites")
+    def is_favorite(self, p_id):
+        return self.conn.execute("SELECT 1 FROM favorites WHERE id=?", (p_id,)).fetchone() is not None
+
+    def search_favorite_ids(self, query):
+        """Returns the set of favorite ids with query as a substring of a searchable column."""
+        query = query.strip()
+        if len(query) >= 3:
+            phrase = '"' + query.replace('"', '""') + '"'
+            rows = self.conn.execute("SELECT rowid FROM favorites_fts WHERE favorites_fts MATCH ?", (phrase,))
         else:
-            self.cursor.execute(
-                "UPDATE favorites SET common_name=?, scientific_name=?, family=?, genus=?, year=?, bibliography=?, edible=?, vegetable=?, habit=?, harvest=?, light=?, notes=? WHERE id=?",
-                (common, sci, family, genus, year, bib, edible, veg, habit, harvest, light, notes, p_id)
-            )
-        self.conn.commit()
+            # Trigrams need at least three characters; shorter queries scan
+            where = " OR ".join(f"instr(lower({c}), ?) > 0" for c in FAVORITE_SEARCH_COLUMNS)
+            rows = self.conn.execute(f"SELECT id FROM favorites WHERE {where}", (query.lower(),) * len(FAVORITE_SEARCH_COLUMNS))
+        return {row[0] for row in rows}
+
+    @_cached("favorites")
+    def get_favorite_names(self):
+        return self.conn.execute("SELECT id, common_name FROM favorites ORDER BY common_name").fetchall()
+
+    @_cached("favorites")
+    def get_plant_count(self):
+        return self.conn.execute("SELECT COUNT(*) FROM favorites").fetchone()[0]
+
+    @_cached("favorites", "care_events")
+    def get_plants_to_water(self, limit):
+        """The plants that have gone longest without water, never-watered first."""
+        return self._query(
+            Plant, f"SELECT {_PLANT_SQL} FROM favorites f ORDER BY f.last_watered_epoch LIMIT ?",
+            (limit,)
+        ).fetchall()
+
+    def dashboard_summary(self, limit):
+        """Everything the dashboard shows, read from one consistent snapshot.
+
+        Returns a dict with plant_count, collection_count, the first limit
+        pending reminders, overdue_count and the limit plants most in need
+        of water.
+        """
+        # Today is part of the cache key, so the overdue count rolls over
+        return self._dashboard_summary(limit, to_julian_day(date.today()))
+
+    @_cached("favorites", "layouts", "reminders", "care_events")
+    def _dashboard_summary(self, limit, today):
+        conn = self.conn
+        own_transaction = not conn.in_transaction
+        if own_transaction:
+            conn.execute("BEGIN")
+        try:
+            return {
+                "plant_count": conn.execute("SELECT COUNT(*) FROM favorites").fetchone()[0],
+                "collection_count": conn.execute("SELECT COUNT(*) FROM layouts").fetchone()[0],
+                "reminders": self._query(
+                    Reminder, "SELECT id, task, date(due_day) FROM reminders WHERE completed=0 ORDER BY due_day, id LIMIT ?",
+                    (limit,)
+                ).fetchall(),
+                "overdue_count": conn.execute(
+                    "SELECT COUNT(*) FROM reminders WHERE completed=0 AND due_day < ?",
+                    (today,)
+                ).fetchone()[0],
+                "plants_to_water": self._query(
+                    Plant, f"SELECT {_PLANT_SQL} FROM favorites f ORDER BY f.last_watered_epoch LIMIT ?",
+                    (limit,)
+                ).fetchall(),
+            }
+        finally:
+            if own_transaction:
+                conn.commit()
+
+    # --- Care events ---
+    @_invalidates("care_events")
+    def add_care_event(self, p_id, kind, when=None):
+        """Logs a care event; when is a datetime and defaults to now."""
+        ts = int((when or datetime.now()).timestamp())
+        with self.transaction() as conn:
+            conn.execute("INSERT INTO care_events (plant_id, kind, ts_epoch) VALUES (?, ?, ?)", (p_id, kind, ts))
         return True
 
-    def water_plant(self, p_id, timestamp):
-        self.cursor.execute("UPDATE favorites SET last_watered=? WHERE id=?", (timestamp, p_id))
-        self.conn.commit()
+    def water_plant(self, p_id, when=None):
+        return self.add_care_event(p_id, "water", when)
+
+    @_invalidates("care_events")
+    def water_plants_bulk(self, p_ids, when=None):
+        ts = int((when or datetime.now()).timestamp())
+        with self.transaction() as conn:
+            conn.executemany(
+                "INSERT INTO care_events (plant_id, kind, ts_epoch) VALUES (?, 'water', ?)",
+                ((p_id, ts) for p_id in p_ids)
+            )
         return True
 
-    def add_reminder(self, task, date):
-        self.cursor.execute("INSERT INTO reminders (task, due_date) VALUES (?, ?)", (task, date))
-        self.conn.commit()
+    @_cached("care_events")
+    def get_last_care_event(self, p_id, kind="water"):
+        """Epoch of the plant's newest event of this kind, or None."""
+        return self.conn.execute(
+            "SELECT MAX(ts_epoch) FROM care_events WHERE plant_id=? AND kind=?", (p_id, kind)
+        ).fetchone()[0]
+
+    @_cached("care_events")
+    def get_care_history(self, p_id, kind="water", limit=20):
+        """Epochs of the plant's most recent events of this kind, newest first."""
+        rows = self.conn.execute(
+            "SELECT ts_epoch FROM care_events WHERE plant_id=? AND kind=? ORDER BY ts_epoch DESC LIMIT ?",
+            (p_id, kind, limit)
+        ).fetchall()
+        return [r[0] for r in rows]
+
+    def count_care_events(self, p_id, kind, since, until=None):
+        """Number of events of this kind between two datetimes (until defaults to now)."""
+        return self.conn.execute(
+            "SELECT COUNT(*) FROM care_events WHERE plant_id=? AND kind=? AND ts_epoch >= ? AND ts_epoch <= ?",
+            (p_id, kind, int(since.timestamp()), int((until or datetime.now()).timestamp()))
+        ).fetchone()[0]
+
+    @_invalidates("reminders")
+    def add_reminder(self, task, due):
+        """Adds a reminder due on a date or "YYYY-MM-DD" string; raises ValueError on a bad date."""
+        day = to_julian_day(due)
+        with self.transaction() as conn:
+            conn.execute("INSERT INTO reminders (task, due_day) VALUES (?, ?)", (task, day))
         return True
-    
+
+    @_invalidates("reminders")
+    def add_reminders_bulk(self, reminders):
+        """Inserts (task, date) pairs in one transaction and returns how many were added."""
+        rows = [(task, to_julian_day(due)) for task, due in reminders]
+        with self.transaction() as conn:
+            cursor = conn.executemany("INSERT INTO reminders (task, due_day) VALUES (?, ?)", rows)
+        return cursor.rowcount
+
+    # Reminder reads return Reminders in due order
+    @_cached("reminders")
     def get_reminders(self):
-        self.cursor.execute("SELECT id, task, due_date FROM reminders WHERE completed=0 ORDER BY due_date ASC")
-        return self.cursor.fetchall()
+        return self._query(
+            Reminder, "SELECT id, task, date(due_day) FROM reminders WHERE completed=0 ORDER BY due_day, id"
+        ).fetchall()
+
+    @_cached("reminders")
+    def get_reminders_page(self, after_due=None, after_id=None, limit=50):
+        """Pending reminders ordered by (due date, id), starting after the given key."""
+        if after_id is None:
+            return self._query(
+                Reminder, "SELECT id, task, date(due_day) FROM reminders WHERE completed=0 ORDER BY due_day, id LIMIT ?",
+                (limit,)
+            ).fetchall()
+        return self._query(
+            Reminder, "SELECT id, task, date(due_day) FROM reminders WHERE completed=0 AND (due_day, id) > (?, ?) ORDER BY due_day, id LIMIT ?",
+            (to_julian_day(after_due), after_id, limit)
+        ).fetchall()
+
+    @_cached("reminders")
+    def get_reminders_between(self, start, end):
+        """Pending reminders due from start to end, both inclusive."""
+        return self._query(
+            Reminder, "SELECT id, task, date(due_day) FROM reminders WHERE completed=0 AND due_day BETWEEN ? AND ? ORDER BY due_day, id",
+            (to_julian_day(start), to_julian_day(end))
+        ).fetchall()
+
+    def get_reminders_on(self, due):
+        return self.get_reminders_between(due, due)
+
+    def get_reminders_due_soon(self, days=7, today=None):
+        """Pending reminders due today or within the next days days."""
+        today = today or date.today()
+        return self.get_reminders_between(today, today + timedelta(days=days))
+
+    def get_reminders_in_month(self, year, month):
+        first = date(year, month, 1)
+        last = (first + timedelta(days=31)).replace(day=1) - timedelta(days=1)
+        return self.get_reminders_between(first, last)
+
+    def get_overdue_reminders(self, today=None):
+        return self._get_reminders_before(to_julian_day(today or date.today()))
 
+    @_cached("reminders")
+    def _get_reminders_before(self, day):
+        return self._query(
+            Reminder, "SELECT id, task, date(due_day) FROM reminders WHERE completed=0 AND due_day < ? ORDER BY due_day, id",
+            (day,)
+        ).fetchall()
+
+    @_invalidates("reminders")
     def delete_reminder(self, r_id):
-        self.cursor.execute("DELETE FROM reminders WHERE id=?", (r_id,))
-        self.conn.commit()
+        with self.transaction() as conn:
+            conn.execute("DELETE FROM reminders WHERE id=?", (r_id,))
         return True
 
+    @_invalidates("reminders")
     def complete_reminder(self, r_id):
-        self.cursor.execute("UPDATE reminders SET completed=1 WHERE id=?", (r_id,))
-        self.conn.commit()
+        with self.transaction() as conn:
+            conn.execute("UPDATE reminders SET completed=1 WHERE id=?", (r_id,))
         return True
         
+    @_invalidates("journal")
     def add_journal_entry(self, title, content):
-        self.cursor.execute("INSERT INTO journal (title, content) VALUES (?, ?)", (title, content))
-        self.conn.commit()
+        with self.transaction() as conn:
+            conn.execute("INSERT INTO journal (title, content) VALUES (?, ?)", (title, content))
         return True
         
+    @_cached("journal")
     def get_journal_entries(self):
-        self.cursor.execute("SELECT id, title, content, date FROM journal ORDER BY date DESC")
-        return self.cursor.fetchall()
+        return self._query(JournalEntry, "SELECT id, title, content, date FROM journal ORDER BY date DESC").fetchall()
+
+    @_cached("journal")
+    def get_journal_page(self, before_date=None, before_id=None, limit=50):
+        """Journal entries ordered newest first by (date, id), starting before the given key."""
+        if before_id is None:
+            return self._query(
+                JournalEntry, "SELECT id, title, content, date FROM journal ORDER BY date DESC, id DESC LIMIT ?",
+                (limit,)
+            ).fetchall()
+        return self._query(
+            JournalEntry, "SELECT id, title, content, date FROM journal WHERE (date, id) < (?, ?) ORDER BY date DESC, id DESC LIMIT ?",
+            (before_date, before_id, limit)
+        ).fetchall()
 
+    def search_journal(self, query, limit=50, offset=0):
+        """Returns JournalEntries matching query, best first, with a snippet of the match."""
+        match = fts_query(query)
+        if not match:
+            return []
+        return self._query(JournalEntry, '''
+            SELECT j.id, j.title, j.content, j.date,
+                   snippet(journal_fts, -1, ?, ?, '…', 12)
+            FROM journal_fts
+            JOIN journal j ON j.id = journal_fts.rowid
+            WHERE journal_fts MATCH ?
+            ORDER BY rank
+            LIMIT ? OFFSET ?
+        ''', (SNIPPET_START, SNIPPET_END, match, limit, offset)).fetchall()
+
+    @_invalidates("journal")
     def delete_journal_entry(self, j_id):
-        self.cursor.execute("DELETE FROM journal WHERE id=?", (j_id,))
-        self.conn.commit()
+        with self.transaction() as conn:
+            conn.execute("DELETE FROM journal WHERE id=?", (j_id,))
         return True
 
+    @_invalidates("journal")
     def update_journal_entry(self, j_id, title, content):
-        self.cursor.execute(
-            "UPDATE journal SET title=?, content=? WHERE id=?",
-            (title, content, j_id)
-        )
-        self.conn.commit()
+        with self.transaction() as conn:
+            conn.execute(
+                "UPDATE journal SET title=?, content=? WHERE id=?",
+                (title, content, j_id)
+            )
         return True
 
     # --- Layouts (Collections) ---
+    @_invalidates("layouts")
     def create_layout(self, name, type_val):
-        self.cursor.execute("INSERT INTO layouts (name, type) VALUES (?, ?)", (name, type_val))
-        self.conn.commit()
-        return self.cursor.lastrowid
+        with self.transaction() as conn:
+            cursor = conn.execute("INSERT INTO layouts (name, type) VALUES (?, ?)", (name, type_val))
+        return cursor.lastrowid
 
+    @_invalidates("layouts")
     def update_layout(self, l_id, name, type_val):
-        self.cursor.execute("UPDATE layouts SET name=?, type=? WHERE id=?", (name, type_val, l_id))
-        self.conn.commit()
+        with self.transaction() as conn:
+            conn.execute("UPDATE layouts SET name=?, type=? WHERE id=?", (name, type_val, l_id))
         return True
 
+    @_cached("layouts")
     def get_layouts(self):
-        self.cursor.execute("SELECT id, name, type, created_date FROM layouts ORDER BY created_date DESC")
-        return self.cursor.fetchall()
+        return self._query(Layout, "SELECT id, name, type, created_date FROM layouts ORDER BY created_date DESC").fetchall()
+
+    @_cached("layouts")
+    def get_layouts_page(self, before_created=None, before_id=None, limit=50):
+        """Layouts ordered newest first by (created_date, id), starting before the given key."""
+        if before_id is None:
+            return self._query(
+                Layout, "SELECT id, name, type, created_date FROM layouts ORDER BY created_date DESC, id DESC LIMIT ?",
+                (limit,)
+            ).fetchall()
+        return self._query(
+            Layout, "SELECT id, name, type, created_date FROM layouts WHERE (created_date, id) < (?, ?) ORDER BY created_date DESC, id DESC LIMIT ?",
+            (before_created, before_id, limit)
+        ).fetchall()
 
+    @_invalidates("layouts", "layout_items")
     def delete_layout(self, l_id):
-        self.cursor.execute("DELETE FROM layouts WHERE id=?", (l_id,))
-        self.cursor.execute("DELETE FROM layout_items WHERE layout_id=?", (l_id,))
-        self.conn.commit()
+        with self.transaction() as conn:
+            conn.execute("DELETE FROM layouts WHERE id=?", (l_id,))
+            conn.execute("DELETE FROM layout_items WHERE layout_id=?", (l_id,))
         return True
 
+    @_cached("layout_items", "favorites")
     def get_layout_items(self, l_id):
         # Join with favorites to get plant name/image
-        self.cursor.execute('''
+        return self._query(LayoutItem, '''
             SELECT li.id, li.plant_id, f.common_name, f.image_url 
             FROM layout_items li
             LEFT JOIN favorites f ON li.plant_id = f.id
             WHERE li.layout_id = ?
-        ''', (l_id,))
-        return self.cursor.fetchall()
+        ''', (l_id,)).fetchall()
 
+    @_invalidates("layout_items")
     def add_layout_item(self, l_id, plant_id):
-        self.cursor.execute("INSERT INTO layout_items (layout_id, plant_id) VALUES (?, ?)", (l_id, plant_id))
-        self.conn.commit()
+        with self.transaction() as conn:
+            conn.execute("INSERT INTO layout_items (layout_id, plant_id) VALUES (?, ?)", (l_id, plant_id))
+        return True
+
+    @_invalidates("layout_items")
+    def add_layout_items_bulk(self, l_id, plant_ids):
+        with self.transaction() as conn:
+            conn.executemany("INSERT INTO layout_items (layout_id, plant_id) VALUES (?, ?)", ((l_id, p_id) for p_id in plant_ids))
         return True
 
+    @_invalidates("layout_items")
     def remove_layout_item(self, l_id, plant_id):
         # Removes all instances of this plant from the layout?
         # Or should we pass the item id? For UI simplicity, passing plant_id is often easier if we assume uniqueness or don't care which one.
@@ -218,20 +906,64 @@ class Database:
         # However, looking at the previous implementation, it removed by coords.
         # Let's support removing by item_id if possible, but the plan said update to remove plant_id.
         # Let's stick to removing by plant_id for now as the prompt implies assigning plants.
-        self.cursor.execute("DELETE FROM layout_items WHERE layout_id=? AND plant_id=?", (l_id, plant_id))
-        self.conn.commit()
+        with self.transaction() as conn:
+            conn.execute("DELETE FROM layout_items WHERE layout_id=? AND plant_id=?", (l_id, plant_id))
         return True
 
+    @_cached("layout_items")
     def get_layouts_for_plant(self, plant_id):
-        self.cursor.execute("SELECT layout_id FROM layout_items WHERE plant_id=?", (plant_id,))
-        rows = self.cursor.fetchall()
+        rows = self.conn.execute("SELECT layout_id FROM layout_items WHERE plant_id=?", (plant_id,)).fetchall()
         return [r[0] for r in rows]
 
+    @_invalidates("layout_items")
     def clear_plant_layouts(self, plant_id):
-        self.cursor.execute("DELETE FROM layout_items WHERE plant_id=?", (plant_id,))
-        self.conn.commit()
+        with self.transaction() as conn:
+            conn.execute("DELETE FROM layout_items WHERE plant_id=?", (plant_id,))
         return True
 
+    @_cached("layouts")
     def get_collections_count(self):
-        self.cursor.execute("SELECT COUNT(*) FROM layouts")
-        return self.cursor.fetchone()[0]
+        return self.conn.execute("SELECT COUNT(*) FROM layouts").fetchone()[0]
+
+    # --- Maintenance ---
+    def optimize(self):
+        """Refreshes query planner statistics for tables whose shape changed.
+
+        analysis_limit bounds the rows ANALYZE samples per index, so this
+        stays cheap however large the journal or care history grows.
+        """
+        with self._write_lock:
+            self.conn.execute("PRAGMA analysis_limit=400")
+            self.conn.execute("PRAGMA optimize")
+
+    def enable_incremental_vacuum(self, max_size=None):
+        """Converts the file to auto_vacuum=INCREMENTAL with a one-off VACUUM.
+
+        Returns whether it did: not if it already was, nor if the file is
+        larger than max_size bytes. VACUUM rewrites the whole file, but only
+        once; from then on incremental_vacuum() reclaims space in steps.
+        """
+        with self._write_lock:
+            conn = self.conn
+            if conn.execute("PRAGMA auto_vacuum").fetchone()[0] == 2:
+                return False
+            if max_size is not None:
+                pages = conn.execute("PRAGMA page_count").fetchone()[0]
+                if pages * conn.execute("PRAGMA page_size").fetchone()[0] > max_size:
+                    return False
+            conn.execute("PRAGMA auto_vacuum=INCREMENTAL")
+            conn.execute("VACUUM")
+            return True
+
+    def freelist_count(self):
+        return self.conn.execute("PRAGMA freelist_count").fetchone()[0]
+
+    def incremental_vacuum(self, pages):
+        """Returns up to pages free pages to the filesystem, returning how many were."""
+        with self._write_lock:
+            conn = self.conn
+            before = self.freelist_count()
+            # execute() steps the pragma only once, freeing a single page;
+            # executescript() runs it to completion
+            conn.executescript(f"PRAGMA incremental_vacuum({int(pages)})")
+            return before - self.freelist_count()
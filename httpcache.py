@@ -0,0 +1,201 @@
+"""
+Persistent HTTP response cache, used by net.get().
+
+Responses are kept in ~/.cache/flora/http.db with the freshness lifetime
+their Cache-Control or Expires headers give them (or, failing that, a
+share of their age since Last-Modified). Fresh entries are answered
+locally. Stale ones are revalidated with If-None-Match/If-Modified-Since,
+and a 304 only refreshes their lifetime. When the network is unreachable
+or the server errors, a stale entry is served rather than nothing.
+"""
+import json
+import os
+import sqlite3
+import threading
+import time
+from email.utils import parsedate_to_datetime
+from gi.repository import GLib
+from requests.structures import CaseInsensitiveDict
+
+# Entries are evicted, least recently used first, above this many bytes
+MAX_SIZE = 64 * 1024 * 1024
+
+# Eviction is checked once every so many stores
+EVICT_EVERY = 50
+
+# Heuristic lifetime for responses with Last-Modified but no explicit
+# freshness: this share of their age, up to HEURISTIC_MAX seconds
+HEURISTIC_FRACTION = 0.1
+HEURISTIC_MAX = 24 * 60 * 60
+
+def default_path():
+    return os.path.join(GLib.get_user_cache_dir(), "flora", "http.db")
+
+def _parse_http_date(value):
+    try:
+        return parsedate_to_datetime(value).timestamp()
+    except (TypeError, ValueError, IndexError):
+        return None
+
+def cache_control(headers):
+    """The Cache-Control directives in headers, as {name: value or True}."""
+    directives = {}
+    for part in headers.get("Cache-Control", "").split(","):
+        name, _, value = part.strip().partition("=")
+        if name:
+            directives[name.lower()] = value.strip('"') if value else True
+    return directives
+
+def freshness_lifetime(headers, now, unvalidated=0):
+    """
+    Seconds a response with headers stays fresh, or None if it mustn't be
+    stored. unvalidated is the lifetime of a response that gives neither
+    freshness nor a validator to revalidate it with.
+    """
+    directives = cache_control(headers)
+    if "no-store" in directives:
+        return None
+    if "no-cache" in directives:
+        return 0
+    if "max-age" in directives:
+        try:
+            return max(0, int(directives["max-age"]))
+        except ValueError:
+            return 0
+
+    date = _parse_http_date(headers.get("Date")) or now
+    expires = headers.get("Expires")
+    if expires:
+        expires_at = _parse_http_date(expires)
+        return max(0, expires_at - date) if expires_at else 0
+
+    modified = _parse_http_date(headers.get("Last-Modified"))
+    if modified:
+        return min(HEURISTIC_MAX, max(0, (date - modified) * HEURISTIC_FRACTION))
+    return 0 if headers.get("ETag") else unvalidated
+
+class CachedResponse:
+    """A stored response. body is None when only its validators were kept."""
+
+    __slots__ = ("url", "status", "headers", "body", "expires")
+
+    def __init__(self, url, status, headers, body, expires):
+        self.url = url
+        self.status = status
+        self.headers = CaseInsensitiveDict(json.loads(headers))
+        self.body = body
+        self.expires = expires
+
+    @property
+    def fresh(self):
+        return time.time() < self.expires
+
+    def validators(self):
+        """Conditional request headers for revalidating this response."""
+        headers = {}
+        if self.headers.get("ETag"):
+            headers["If-None-Match"] = self.headers["ETag"]
+        if self.headers.get("Last-Modified"):
+            headers["If-Modified-Since"] = self.headers["Last-Modified"]
+        return headers
+
+class HTTPCache:
+    def __init__(self, path=None):
+        self.path = path or default_path()
+        os.makedirs(os.path.dirname(self.path), exist_ok=True)
+        self._local = threading.local()
+        self._stores = 0
+        self._lock = threading.Lock()
+
+        with self.conn:
+            self.conn.execute('''
+                CREATE TABLE IF NOT EXISTS responses (
+                    url TEXT PRIMARY KEY,
+                    status INTEGER NOT NULL,
+                    headers TEXT NOT NULL,
+                    body BLOB,
+                    expires REAL NOT NULL,
+                    accessed REAL NOT NULL,
+                    size INTEGER NOT NULL
+                )
+            ''')
+            self.conn.execute("CREATE INDEX IF NOT EXISTS idx_responses_accessed ON responses(accessed)")
+
+    @property
+    def conn(self):
+        """The calling thread's connection, opened on first use."""
+        conn = getattr(self._local, "conn", None)
+        if conn is None:
+            conn = sqlite3.connect(self.path, timeout=30, check_same_thread=False)
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA synchronous=NORMAL")
+            self._local.conn = conn
+        return conn
+
+    def lookup(self, url):
+        """The stored response for url, or None."""
+        row = self.conn.execute(
+            "SELECT url, status, headers, body, expires FROM responses WHERE url = ?", (url,)
+        ).fetchone()
+        if row is None:
+            return None
+        with self.conn:
+            self.conn.execute("UPDATE responses SET accessed = ? WHERE url = ?", (time.time(), url))
+        return CachedResponse(*row)
+
+    def store(self, url, status, headers, body, unvalidated=0):
+        """
+        Stores a response, unless its headers forbid it; with body None,
+        only its validators. unvalidated is passed on to
+        freshness_lifetime(). Returns whether it was stored.
+        """
+        now = time.time()
+        headers = CaseInsensitiveDict(headers)
+        lifetime = freshness_lifetime(headers, now, unvalidated)
+        if lifetime is None:
+            self.forget(url)
+            return False
+        with self.conn:
+            self.conn.execute(
+                "INSERT OR REPLACE INTO responses VALUES (?, ?, ?, ?, ?, ?, ?)",
+                (url, status, json.dumps(dict(headers)), body, now + lifetime, now, len(body or b""))
+            )
+        self._maybe_evict()
+        return True
+
+    def refresh(self, entry, headers):
+        """Applies the headers of a 304 to entry, giving it a new lifetime."""
+        merged = CaseInsensitiveDict(entry.headers)
+        merged.update(headers)
+        now = time.time()
+        lifetime = freshness_lifetime(merged, now) or 0
+        with self.conn:
+            self.conn.execute(
+                "UPDATE responses SET headers = ?, expires = ?, accessed = ? WHERE url = ?",
+                (json.dumps(dict(merged)), now + lifetime, now, entry.url)
+            )
+        entry.headers = merged
+        entry.expires = now + lifetime
+
+    def forget(self, url):
+        with self.conn:
+            self.conn.execute("DELETE FROM responses WHERE url = ?", (url,))
+
+    def _maybe_evict(self):
+        with self._lock:
+            self._stores += 1
+            if self._stores % EVICT_EVERY:
+                return
+        total = self.conn.execute("SELECT COALESCE(SUM(size), 0) FROM responses").fetchone()[0]
+        if total <= MAX_SIZE:
+            return
+        excess = total - MAX_SIZE
+        freed = 0
+        victims = []
+        for url, size in self.conn.execute("SELECT url, size FROM responses ORDER BY accessed"):
+            victims.append((url,))
+            freed += size
+            if freed >= excess:
+                break
+        with self.conn:
+            self.conn.executemany("DELETE FROM responses WHERE url = ?", victims)
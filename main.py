@@ -22,6 +22,8 @@ else:
         resource._register()
 
 from window import PlantWindow
+import transfer
+import backup
 
 # Default Configuration
 # Placeholder for API key. Users should set this in the settings or via environment variable.
@@ -93,6 +95,22 @@ class App(Adw.Application):
         city_action.connect("activate", self.on_city_activated)
         self.add_action(city_action)
 
+        export_action = Gio.SimpleAction.new("export_data", None)
+        export_action.connect("activate", self.on_export_activated)
+        self.add_action(export_action)
+
+        import_action = Gio.SimpleAction.new("import_data", None)
+        import_action.connect("activate", self.on_import_activated)
+        self.add_action(import_action)
+
+        backup_action = Gio.SimpleAction.new("backup", None)
+        backup_action.connect("activate", self.on_backup_activated)
+        self.add_action(backup_action)
+
+        restore_action = Gio.SimpleAction.new("restore", None)
+        restore_action.connect("activate", self.on_restore_activated)
+        self.add_action(restore_action)
+
     def apply_theme(self, theme):
         style_manager = Adw.StyleManager.get_default()
         if theme == "light":
@@ -206,5 +224,128 @@ class App(Adw.Application):
 
         dialog.choose(self.win, None, callback)
 
+    def on_export_activated(self, action, parameter):
+        dialog = Gtk.FileChooserNative(
+            title="Export Flora Data",
+            transient_for=self.win,
+            action=Gtk.FileChooserAction.SAVE,
+            accept_label="_Save",
+            cancel_label="_Cancel"
+        )
+        dialog.set_current_name("flora-export.ndjson")
+
+        def export(path):
+            with open(path, 'w', encoding='utf-8') as f:
+                return transfer.export_ndjson(self.win.db, f)
+
+        def on_response(d, response):
+            if response == Gtk.ResponseType.ACCEPT:
+                self.win.db.submit(
+                    export, d.get_file().get_path(),
+                    callback=lambda counts: self.win.show_toast(f"Exported {sum(counts.values())} records"),
+                    error_callback=lambda e: self.win.show_toast(f"Export failed: {e}")
+                )
+            d.destroy()
+
+        dialog.connect("response", on_response)
+        dialog.show()
+
+    def on_import_activated(self, action, parameter):
+        dialog = Gtk.FileChooserNative(
+            title="Import Flora Data",
+            transient_for=self.win,
+            action=Gtk.FileChooserAction.OPEN,
+            accept_label="_Open",
+            cancel_label="_Cancel"
+        )
+
+        def import_(path):
+            with open(path, 'r', encoding='utf-8') as f:
+                return transfer.import_ndjson(self.win.db, f)
+
+        def on_imported(counts):
+            self.win.on_tab_changed(self.win.view_stack, None)
+            self.win.show_toast(f"Imported {sum(counts.values())} records")
+
+        def on_response(d, response):
+            if response == Gtk.ResponseType.ACCEPT:
+                self.win.db.submit(
+                    import_, d.get_file().get_path(),
+                    callback=on_imported,
+                    error_callback=lambda e: self.win.show_toast(f"Import failed: {e}")
+                )
+            d.destroy()
+
+        dialog.connect("response", on_response)
+        dialog.show()
+
+    def on_backup_activated(self, action, parameter):
+        dialog = Gtk.FileChooserNative(
+            title="Back Up Flora",
+            transient_for=self.win,
+            action=Gtk.FileChooserAction.SAVE,
+            accept_label="_Save",
+            cancel_label="_Cancel"
+        )
+        dialog.set_current_name(f"flora-backup-{GLib.DateTime.new_now_local().format('%Y-%m-%d')}.tar.gz")
+        dialog.add_choice("image_cache", "Include downloaded images", None, None)
+
+        def run(path, include_cache):
+            # A plain thread rather than the database worker, so queries
+            # keep flowing while the snapshot is copied
+            try:
+                backup.create_backup(self.win.db, path, include_image_cache=include_cache)
+                GLib.idle_add(self.win.show_toast, "Backup saved")
+            except Exception as e:
+                print(f"Backup error: {e}")
+                GLib.idle_add(self.win.show_toast, f"Backup failed: {e}")
+
+        def on_response(d, response):
+            if response == Gtk.ResponseType.ACCEPT:
+                include_cache = d.get_choice("image_cache") == "true"
+                threading.Thread(target=run, args=(d.get_file().get_path(), include_cache), daemon=True).start()
+            d.destroy()
+
+        dialog.connect("response", on_response)
+        dialog.show()
+
+    def on_restore_activated(self, action, parameter):
+        dialog = Gtk.FileChooserNative(
+            title="Restore Flora Backup",
+            transient_for=self.win,
+            action=Gtk.FileChooserAction.OPEN,
+            accept_label="_Restore",
+            cancel_label="_Cancel"
+        )
+
+        filter_tar = Gtk.FileFilter()
+        filter_tar.set_name("Flora Backups (*.tar.gz)")
+        filter_tar.add_pattern("*.tar.gz")
+        dialog.add_filter(filter_tar)
+
+        def on_restored():
+            self.win.on_tab_changed(self.win.view_stack, None)
+            self.win.show_toast("Backup restored")
+            return False
+
+        def run(path):
+            try:
+                backup.restore_backup(self.win.db, path)
+                GLib.idle_add(on_restored)
+            except Exception as e:
+                print(f"Restore error: {e}")
+                GLib.idle_add(self.win.show_toast, f"Restore failed: {e}")
+
+        def on_response(d, response):
+            if response == Gtk.ResponseType.ACCEPT:
+                threading.Thread(target=run, args=(d.get_file().get_path(),), daemon=True).start()
+            d.destroy()
+
+        dialog.connect("response", on_response)
+        dialog.show()
+
 if __name__ == "__main__":
+    # `flora export FILE` / `flora import FILE` run headless
+    if len(sys.argv) > 1 and sys.argv[1] in ("export", "import"):
+        sys.exit(transfer.main(sys.argv[1:]))
     App().run(sys.argv)
@@ -0,0 +1,113 @@
+"""
+Idle-time database upkeep: planner statistics and returning free pages.
+
+Every step runs as its own job on the database worker, so queries queued
+by the views only ever wait for one small step. The one exception, the
+VACUUM that converts an older file to incremental vacuum, runs at
+shutdown, when nothing is waiting on it, and only for files small enough
+to rewrite quickly.
+"""
+import time
+from gi.repository import GLib
+
+# First run shortly after startup, then hourly while the app stays open
+INITIAL_DELAY = 120
+INTERVAL = 60 * 60
+
+# Free pages returned per step, and steps per run
+PAGES_PER_STEP = 64
+MAX_STEPS = 64
+
+# Largest file converted to incremental vacuum at shutdown. VACUUM rewrites
+# all of it, so larger ones keep plain auto_vacuum rather than hold up exit.
+CONVERT_MAX_SIZE = 32 * 1024 * 1024
+
+class MaintenanceScheduler:
+    def __init__(self, db):
+        self.db = db
+        self.running = False
+        self.source_id = None
+
+        self.reclaimed = 0
+        self.steps = 0
+        self.elapsed = 0.0
+
+    def start(self):
+        self.source_id = GLib.timeout_add_seconds(INITIAL_DELAY, self._on_first_timeout)
+
+    def shutdown(self):
+        """
+        Cancels pending runs and queues a final optimize, and the one-off
+        conversion to incremental vacuum, before the database closes.
+        """
+        if self.source_id:
+            GLib.source_remove(self.source_id)
+            self.source_id = None
+        self.db.submit(self._timed, self.db.optimize)
+        self.db.submit(self._convert)
+
+    def run(self):
+        if self.running:
+            return
+        self.running = True
+        self.db.submit(self._prepare, callback=self._on_prepared, error_callback=self._on_error)
+
+    def _on_first_timeout(self):
+        self.run()
+        self.source_id = GLib.timeout_add_seconds(INTERVAL, self._on_interval)
+        return False
+
+    def _on_interval(self):
+        self.run()
+        return True
+
+    # Runs on the database worker
+    def _prepare(self):
+        start = time.perf_counter()
+        self.db.optimize()
+        free = self.db.freelist_count()
+        ms = (time.perf_counter() - start) * 1000
+        print(f"Database maintenance: Optimized in {ms:.1f} ms, {free} free pages")
+        return free
+
+    # Runs on the database worker
+    def _convert(self):
+        start = time.perf_counter()
+        if self.db.enable_incremental_vacuum(CONVERT_MAX_SIZE):
+            ms = (time.perf_counter() - start) * 1000
+            print(f"Database maintenance: Converted to incremental vacuum in {ms:.1f} ms")
+
+    # Runs on the database worker
+    def _timed(self, func, *args):
+        start = time.perf_counter()
+        result = func(*args)
+        return result, time.perf_counter() - start
+
+    def _on_prepared(self, free):
+        self.reclaimed = 0
+        self.steps = 0
+        self.elapsed = 0.0
+        if free:
+            self._step()
+        else:
+            self.running = False
+
+    def _step(self):
+        self.db.submit(
+            self._timed, self.db.incremental_vacuum, PAGES_PER_STEP,
+            callback=self._on_step, error_callback=self._on_error
+        )
+
+    def _on_step(self, result):
+        freed, elapsed = result
+        self.reclaimed += freed
+        self.elapsed += elapsed
+        self.steps += 1
+        if freed == PAGES_PER_STEP and self.steps < MAX_STEPS:
+            self._step()
+            return
+        print(f"Database maintenance: Reclaimed {self.reclaimed} pages in {self.steps} steps, {self.elapsed * 1000:.1f} ms")
+        self.running = False
+
+    def _on_error(self, error):
+        self.running = False
@@ -0,0 +1,86 @@
+"""
+Typed records for rows read from the Flora database.
+
+Rows are built by sqlite3 row factories (see row_factory()), so field order
+must match the column order of the queries in database.py. Records are
+frozen because Database caches them and shares them between callers.
+"""
+from dataclasses import dataclass
+from typing import Optional
+
+@dataclass(frozen=True, slots=True)
+class Plant:
+    id: int
+    common_name: Optional[str] = None
+    scientific_name: Optional[str] = None
+    family: Optional[str] = None
+    genus: Optional[str] = None
+    year: Optional[str] = None
+    bibliography: Optional[str] = None
+    edible: Optional[str] = None
+    vegetable: Optional[str] = None
+    image_url: Optional[str] = None
+    habit: Optional[str] = None
+    harvest: Optional[str] = None
+    light: Optional[str] = None
+    notes: Optional[str] = None
+    added_date: Optional[str] = None
+    last_watered: Optional[int] = None  # Epoch of the newest watering
+
+    @classmethod
+    def from_api(cls, data):
+        """Builds a plant from a search result (Trefle, Perenual or plants.json)."""
+        year = data.get('year')
+        harvest = data.get('days_to_harvest')
+        light = data.get('light')
+        return cls(
+            id=data.get('id'),
+            common_name=data.get('common_name'),
+            scientific_name=data.get('scientific_name'),
+            family=data.get('family_common_name') or data.get('family'),
+            genus=data.get('genus'),
+            year=str(year) if year else None,
+            bibliography=data.get('bibliography'),
+            image_url=data.get('image_url'),
+            habit=data.get('growth_habit'),
+            harvest=str(harvest) if harvest else None,
+            light=str(light) if light else None,
+        )
+
+    @property
+    def display_name(self):
+        return self.common_name or self.scientific_name or "Unknown"
+
+@dataclass(frozen=True, slots=True)
+class Reminder:
+    id: int
+    task: str
+    due: str  # YYYY-MM-DD
+
+@dataclass(frozen=True, slots=True)
+class JournalEntry:
+    id: int
+    title: Optional[str]
+    content: Optional[str]
+    date: str
+    snippet: Optional[str] = None  # Only set on search results
+
+@dataclass(frozen=True, slots=True)
+class Layout:
+    id: int
+    name: str
+    type: str
+    created_date: str
+
+@dataclass(frozen=True, slots=True)
+class LayoutItem:
+    id: int
+    plant_id: int
+    common_name: Optional[str]
+    image_url: Optional[str]
+
+def row_factory(model):
+    """Returns a sqlite3 row factory that builds model from each row."""
+    def factory(cursor, row):
+        return model(*row)
+    return factory
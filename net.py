@@ -0,0 +1,283 @@
+"""
+Process-wide HTTP client.
+
+Every request Flora makes goes through one requests.Session, so
+connections (and their TLS sessions) are kept alive and reused per host.
+Idempotent requests are retried with jittered exponential backoff on
+connection errors, 429 and 5xx, honouring Retry-After. Requests to the
+plant and weather APIs are spaced out by per-host token buckets, so a
+burst of searches queues briefly here instead of being refused upstream.
+
+GET responses are also kept in a persistent HTTP cache (see httpcache.py),
+so repeat requests are answered locally or with a cheap revalidation, and
+still work offline.
+
+Work that can be superseded (a search, the plant being shown) passes a
+CancelToken; once it is cancelled, calls made with it stop at the next
+step and raise Cancelled instead of finishing for nothing. A response
+that has already arrived is still cached and returned, since it costs
+nothing more to keep; callers just don't show it.
+"""
+import os
+import threading
+import time
+
+import requests
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+
+from httpcache import HTTPCache
+
+USER_AGENT = "Flora/0.1 (https://github.com/cadmiumcmyk/Flora; your@email.com)"
+DEFAULT_TIMEOUT = 10
+
+# Connections kept open per host. Image downloads for a page of results
+# are the most concurrent requests we make.
+POOL_CONNECTIONS = 8
+POOL_MAXSIZE = 8
+
+RETRY = Retry(
+    total=3,
+    backoff_factor=0.5,       # 0.5 s, 1 s, 2 s...
+    backoff_jitter=0.25,      # ...plus up to 0.25 s, so retries don't line up
+    backoff_max=10,
+    status_forcelist=(429, 500, 502, 503, 504),
+    allowed_methods=frozenset({"GET", "HEAD"}),
+    respect_retry_after_header=True,
+    # Return the last response rather than raising, so callers keep their
+    # own status_code handling
+    raise_on_status=False,
+)
+
+# Bytes read between cancellation checks while downloading
+CHUNK_SIZE = 64 * 1024
+
+# Downloads whose server gives neither a lifetime nor a validator are
+# trusted for this long, rather than fetched in full every time
+UNVALIDATED_LIFETIME = 24 * 60 * 60
+
+# Host suffix -> (requests per second, burst), within each API's published limits
+RATE_LIMITS = {
+    "trefle.io": (2.0, 5),
+    "perenual.com": (1.0, 3),
+    "open-meteo.com": (5.0, 10),
+}
+
+class Cancelled(Exception):
+    """Raised by calls whose CancelToken was cancelled."""
+
+class CancelToken:
+    """Marks a piece of background work as superseded once cancel() is called."""
+
+    def __init__(self):
+        self._event = threading.Event()
+
+    def cancel(self):
+        self._event.set()
+
+    @property
+    def cancelled(self):
+        return self._event.is_set()
+
+    def check(self):
+        if self._event.is_set():
+            raise Cancelled()
+
+    def sleep(self, seconds):
+        """Sleeps for seconds, raising Cancelled as soon as the token is cancelled."""
+        if self._event.wait(seconds):
+            raise Cancelled()
+
+class TokenBucket:
+    """Allows rate requests per second on average and bursts of up to capacity."""
+
+    def __init__(self, rate, capacity):
+        self.rate = rate
+        self.capacity = capacity
+        self.tokens = capacity
+        self.updated = time.monotonic()
+        self.lock = threading.Lock()
+
+    def acquire(self, cancel=None):
+        """Takes a token, sleeping until one is available."""
+        while True:
+            with self.lock:
+                now = time.monotonic()
+                self.tokens = min(self.capacity, self.tokens + (now - self.updated) * self.rate)
+                self.updated = now
+                if self.tokens >= 1:
+                    self.tokens -= 1
+                    return
+                wait = (1 - self.tokens) / self.rate
+            if cancel:
+                cancel.sleep(wait)
+            else:
+                time.sleep(wait)
+
+_session = None
+_session_lock = threading.Lock()
+_cache = None
+_cache_failed = False
+_buckets = {suffix: TokenBucket(*limit) for suffix, limit in RATE_LIMITS.items()}
+_revalidating = set()
+_revalidating_lock = threading.Lock()
+
+def session():
+    """The shared session, created on first use."""
+    global _session
+    with _session_lock:
+        if _session is None:
+            s = requests.Session()
+            s.headers["User-Agent"] = USER_AGENT
+            adapter = HTTPAdapter(
+                pool_connections=POOL_CONNECTIONS,
+                pool_maxsize=POOL_MAXSIZE,
+                max_retries=RETRY,
+            )
+            s.mount("https://", adapter)
+            s.mount("http://", adapter)
+            _session = s
+        return _session
+
+def http_cache():
+    """The shared response cache, or None if it couldn't be opened."""
+    global _cache, _cache_failed
+    with _session_lock:
+        if _cache is None and not _cache_failed:
+            try:
+                _cache = HTTPCache()
+            except Exception as e:
+                print(f"HTTP cache unavailable: {e}")
+                _cache_failed = True
+        return _cache
+
+def _bucket_for(url):
+    host = requests.utils.urlparse(url).hostname or ""
+    for suffix, bucket in _buckets.items():
+        if host == suffix or host.endswith("." + suffix):
+            return bucket
+    return None
+
+def get(url, params=None, timeout=DEFAULT_TIMEOUT, cancel=None, **kwargs):
+    """
+    Like requests.get(), through the shared session, rate limits and HTTP
+    cache. Responses have a from_cache attribute, True when they were
+    answered (or revalidated) from the cache.
+    """
+    return _get(url, params, timeout, cancel, kwargs)
+
+def download(url, path, timeout=DEFAULT_TIMEOUT, cancel=None):
+    """
+    Keeps the file at path up to date with url. The HTTP cache only keeps
+    the response's validators; its body lives in the file. Returns whether
+    path holds a copy.
+
+    An existing copy is used as it is: if it's stale, it is revalidated in
+    the background and the new version shows up next time, so a slow or
+    unreachable server never holds up showing it.
+    """
+    if not os.path.exists(path):
+        return _download(url, path, timeout, cancel, have_copy=False)
+    cache = http_cache()
+    entry = cache.lookup(_prepared_url(url)) if cache else None
+    if entry is None or not entry.fresh:
+        _revalidate_later(url, path, timeout)
+    return True
+
+def _revalidate_later(url, path, timeout):
+    with _revalidating_lock:
+        if path in _revalidating:
+            return
+        _revalidating.add(path)
+
+    def revalidate():
+        try:
+            _download(url, path, timeout, None, have_copy=True)
+        finally:
+            with _revalidating_lock:
+                _revalidating.discard(path)
+
+    threading.Thread(target=revalidate, daemon=True).start()
+
+def _download(url, path, timeout, cancel, have_copy):
+    try:
+        response = _get(
+            url, None, timeout, cancel, {"stream": True},
+            keep_body=False, use_cache=have_copy, unvalidated=UNVALIDATED_LIFETIME
+        )
+    except requests.RequestException as e:
+        print(f"Download error for {url}: {e}")
+        return have_copy
+    with response:
+        if response.status_code != 200:
+            return have_copy
+        if not response.from_cache:
+            part = path + ".part"
+            try:
+                with open(part, 'wb') as f:
+                    for chunk in response.iter_content(CHUNK_SIZE):
+                        if cancel:
+                            cancel.check()
+                        f.write(chunk)
+            except BaseException:
+                os.remove(part)
+                raise
+            os.replace(part, path)
+    return True
+
+def _prepared_url(url, params=None):
+    """url with params encoded into it, as the cache keys responses."""
+    return requests.Request("GET", url, params=params).prepare().url
+
+def _get(url, params, timeout, cancel, kwargs, keep_body=True, use_cache=True, unvalidated=0):
+    cache = http_cache()
+    url = _prepared_url(url, params)
+
+    entry = cache.lookup(url) if cache and use_cache else None
+    if entry and keep_body and entry.body is None:
+        entry = None  # Stored by download(); the body is elsewhere
+    if entry and entry.fresh:
+        return _cached_response(entry)
+
+    headers = dict(kwargs.pop("headers", None) or {})
+    if entry:
+        headers.update(entry.validators())
+
+    if cancel:
+        cancel.check()
+    bucket = _bucket_for(url)
+    if bucket:
+        bucket.acquire(cancel)
+    try:
+        response = session().get(url, headers=headers, timeout=timeout, **kwargs)
+    except (requests.ConnectionError, requests.Timeout):
+        if entry:
+            return _cached_response(entry)  # Offline: stale beats nothing
+        raise
+    if cancel and cancel.cancelled and kwargs.get("stream"):
+        # The body hasn't been read yet, so it needn't be
+        response.close()
+        raise Cancelled()
+
+    if entry and response.status_code == 304:
+        cache.refresh(entry, response.headers)
+        return _cached_response(entry)
+    if entry and response.status_code >= 500:
+        return _cached_response(entry)
+
+    response.from_cache = False
+    if cache and response.status_code == 200:
+        body = response.content if keep_body else None
+        cache.store(url, response.status_code, response.headers, body, unvalidated)
+    return response
+
+def _cached_response(entry):
+    response = requests.Response()
+    response.status_code = entry.status
+    response.headers = entry.headers
+    response._content = entry.body or b""
+    response._content_consumed = True
+    response.encoding = requests.utils.get_encoding_from_headers(response.headers)
+    response.url = entry.url
+    response.from_cache = True
+    return response
@@ -0,0 +1,86 @@
+"""
+Latency budget for typo correction in the offline catalog.
+
+Corrections must stay interactive at 500k names, in memory and in a
+compiled catalog.db alike. Building a catalog that size takes a while, so
+the benchmark only runs when asked to:
+
+    FLORA_BENCH=1 python3 -m pytest tests/test_catalog_fuzzy.py
+"""
+import json
+import os
+import random
+import sys
+import time
+
+import pytest
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+import catalog  # noqa: E402
+
+NAMES = 500_000
+QUERIES = 200
+
+# 95th percentile of a single word correction, in milliseconds
+P95_BUDGET_MS = 100
+
+pytestmark = pytest.mark.skipif(
+    not os.environ.get("FLORA_BENCH"), reason="benchmark; set FLORA_BENCH=1 to run"
+)
+
+# Latin-looking words built from common syllables, so names share prefixes
+# and deletions the way real binomials do
+SYLLABLES = [
+    "a", "o", "u", "i", "e", "la", "ri", "ca", "mus", "tha", "pe", "or",
+    "cum", "lis", "na", "ta", "sa", "rum", "gi", "bo", "phy", "ant", "er", "ul",
+]
+
+def _word(rng):
+    return "".join(rng.choice(SYLLABLES) for _ in range(rng.randint(2, 5)))
+
+@pytest.fixture(scope="module")
+def plants():
+    rng = random.Random(1)
+    genera = [_word(rng) for _ in range(20_000)]
+    plants = [{"scientific_name": f"{rng.choice(genera)} {_word(rng)}"} for _ in range(NAMES)]
+    plants.append({"scientific_name": "Ocimum basilicum", "common_name": "Sweet basil"})
+    return plants
+
+@pytest.fixture(scope="module")
+def typos(plants):
+    rng = random.Random(2)
+    # Misspelled epithets, plus words with no correction at all
+    words = [p["scientific_name"].split()[1] for p in rng.sample(plants, QUERIES)]
+    return ["basilicom", "ocimun", "xqzvkw"] + [w[:-1] + "x" for w in words]
+
+@pytest.fixture(scope="module")
+def in_memory(plants):
+    return catalog._FuzzyIndex([catalog.plant_names(p) for p in plants])
+
+@pytest.fixture(scope="module")
+def compiled(plants, tmp_path_factory):
+    directory = tmp_path_factory.mktemp("catalog")
+    source = str(directory / "plants.json")
+    dest = str(directory / "catalog.db")
+    with open(source, "w", encoding="utf-8") as f:
+        json.dump({"data": plants}, f)
+    catalog.compile_catalog(source, dest)
+    return catalog._CompiledFuzzy(catalog._CompiledIndex(dest, os.path.getmtime(dest)))
+
+def _p95_ms(fuzzy, typos):
+    timings = []
+    for word in typos:
+        start = time.perf_counter()
+        fuzzy.correct(word)
+        timings.append((time.perf_counter() - start) * 1000)
+    timings.sort()
+    return timings[int(len(timings) * 0.95)]
+
+@pytest.mark.parametrize("index", ["in_memory", "compiled"])
+def test_correction_latency(index, typos, request):
+    fuzzy = request.getfixturevalue(index)
+    assert fuzzy.correct("basilicom") == "basilicum"
+    p95 = _p95_ms(fuzzy, typos)
+    assert p95 <= P95_BUDGET_MS, f"p95 {p95:.1f} ms over the {P95_BUDGET_MS} ms budget"
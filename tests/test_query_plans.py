@@ -0,0 +1,175 @@
+"""
+Every statement Database runs must be served by an index.
+
+The tables are filled with 100k rows each and analyzed, every public
+Database method is called with the SQL it runs traced, and each traced
+statement is checked with EXPLAIN QUERY PLAN. A full table scan or a
+temporary B-tree for sorting fails the test, naming the method and plan.
+
+Run with: python3 -m pytest tests
+"""
+import os
+import re
+import sys
+import types
+from datetime import date, datetime, timedelta
+
+import pytest
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+try:
+    from gi.repository import GLib  # noqa: F401
+except ImportError:
+    # Only GLib's user directories are needed here
+    gi = types.ModuleType("gi")
+    gi.repository = types.ModuleType("gi.repository")
+    gi.repository.GLib = types.SimpleNamespace()
+    sys.modules["gi"] = gi
+    sys.modules["gi.repository"] = gi.repository
+
+import database  # noqa: E402
+
+ROWS = 100_000
+
+# Methods that read every row by contract, so scanning is the plan
+WHOLE_TABLE_READS = {"get_favorites"}
+
+# Infrastructure rather than queries
+NOT_QUERIES = {
+    "submit", "invalidate_cache", "close", "replace_with", "transaction",
+    "optimize", "enable_incremental_vacuum", "freelist_count", "incremental_vacuum", "conn",
+}
+
+TODAY = date.today()
+NOW = datetime.now()
+
+# Each public query method, called as the views call it
+CALLS = {
+    "add_favorite": lambda db: db.add_favorite(ROWS + 1, "Basil", "Ocimum basilicum", "Lamiaceae", "Ocimum", "1753", "", "yes", "no", None, "herb", "", "full sun", ""),
+    "remove_favorite": lambda db: db.remove_favorite(ROWS + 1),
+    "update_favorite": lambda db: db.update_favorite(5, "Rose", "Rosa", "Rosaceae", "Rosa", "", "", "", "", "shrub", "", "sun", "pruned", image_url=None),
+    "get_favorites": lambda db: db.get_favorites(),
+    "get_favorites_page": lambda db: (db.get_favorites_page(), db.get_favorites_page(after_id=ROWS // 2)),
+    "get_favorite": lambda db: db.get_favorite(7),
+    "is_favorite": lambda db: db.is_favorite(7),
+    "search_favorite_ids": lambda db: db.search_favorite_ids("plant 12"),
+    "get_favorite_names": lambda db: db.get_favorite_names(),
+    "get_plant_count": lambda db: db.get_plant_count(),
+    "get_plants_to_water": lambda db: db.get_plants_to_water(10),
+    "dashboard_summary": lambda db: db.dashboard_summary(10),
+    "add_care_event": lambda db: db.add_care_event(8, "fertilize"),
+    "water_plant": lambda db: db.water_plant(8),
+    "water_plants_bulk": lambda db: db.water_plants_bulk([9, 10]),
+    "get_last_care_event": lambda db: db.get_last_care_event(8),
+    "get_care_history": lambda db: db.get_care_history(8),
+    "count_care_events": lambda db: db.count_care_events(8, "water", NOW - timedelta(days=30)),
+    "add_reminder": lambda db: db.add_reminder("Repot", TODAY),
+    "add_reminders_bulk": lambda db: db.add_reminders_bulk([("Prune", TODAY), ("Feed", TODAY)]),
+    "get_reminders": lambda db: db.get_reminders(),
+    "get_reminders_page": lambda db: (db.get_reminders_page(), db.get_reminders_page(after_due=TODAY.isoformat(), after_id=50)),
+    "get_reminders_between": lambda db: db.get_reminders_between(TODAY, TODAY + timedelta(days=3)),
+    "get_reminders_on": lambda db: db.get_reminders_on(TODAY),
+    "get_reminders_due_soon": lambda db: db.get_reminders_due_soon(),
+    "get_reminders_in_month": lambda db: db.get_reminders_in_month(TODAY.year, TODAY.month),
+    "get_overdue_reminders": lambda db: db.get_overdue_reminders(),
+    "delete_reminder": lambda db: db.delete_reminder(3),
+    "complete_reminder": lambda db: db.complete_reminder(4),
+    "add_journal_entry": lambda db: db.add_journal_entry("Spring", "Sowed basil"),
+    "get_journal_entries": lambda db: db.get_journal_entries(),
+    "get_journal_page": lambda db: (db.get_journal_page(), db.get_journal_page(before_date=TODAY.isoformat(), before_id=ROWS // 2)),
+    "search_journal": lambda db: db.search_journal("basil"),
+    "delete_journal_entry": lambda db: db.delete_journal_entry(3),
+    "update_journal_entry": lambda db: db.update_journal_entry(4, "Summer", "Watered"),
+    "create_layout": lambda db: db.create_layout("Balcony", "Container"),
+    "update_layout": lambda db: db.update_layout(2, "Patio", "Container"),
+    "get_layouts": lambda db: db.get_layouts(),
+    "get_layouts_page": lambda db: (db.get_layouts_page(), db.get_layouts_page(before_created=TODAY.isoformat(), before_id=ROWS // 2)),
+    "delete_layout": lambda db: db.delete_layout(3),
+    "get_layout_items": lambda db: db.get_layout_items(4),
+    "add_layout_item": lambda db: db.add_layout_item(4, 11),
+    "add_layout_items_bulk": lambda db: db.add_layout_items_bulk(4, [12, 13]),
+    "remove_layout_item": lambda db: db.remove_layout_item(4, 11),
+    "get_layouts_for_plant": lambda db: db.get_layouts_for_plant(11),
+    "clear_plant_layouts": lambda db: db.clear_plant_layouts(11),
+    "get_collections_count": lambda db: db.get_collections_count(),
+}
+
+# Plans that read a whole table, or sort outside an index
+_FULL_SCAN = re.compile(r"^SCAN (\w+)$")
+_TEMP_SORT = re.compile(r"USE TEMP B-TREE FOR (ORDER|GROUP) BY")
+
+def _seed(conn):
+    day = database.to_julian_day(TODAY)
+    epoch = int(NOW.timestamp())
+    with conn:
+        conn.executemany(
+            "INSERT INTO favorites (id, common_name, scientific_name, family, genus, notes) VALUES (?, ?, ?, ?, ?, ?)",
+            ((i, f"plant {i}", f"genus{i % 500} species{i}", f"family{i % 50}", f"genus{i % 500}", "") for i in range(1, ROWS + 1))
+        )
+        conn.executemany(
+            "INSERT INTO care_events (plant_id, kind, ts_epoch) VALUES (?, 'water', ?)",
+            ((i % (ROWS // 2) + 1, epoch - i * 60) for i in range(ROWS))
+        )
+        conn.executemany(
+            "INSERT INTO reminders (task, due_day, completed) VALUES (?, ?, ?)",
+            ((f"task {i}", day + i % 365 - 180, int(i % 3 == 0)) for i in range(ROWS))
+        )
+        conn.executemany(
+            "INSERT INTO journal (title, content, date) VALUES (?, ?, date(?, 'utc'))",
+            ((f"entry {i}", f"notes on plant {i}", (TODAY - timedelta(days=i % 2000)).isoformat()) for i in range(ROWS))
+        )
+        conn.executemany(
+            "INSERT INTO layouts (name, type, created_date) VALUES (?, ?, ?)",
+            ((f"layout {i}", "Garden", (TODAY - timedelta(days=i % 2000)).isoformat()) for i in range(ROWS))
+        )
+        conn.executemany(
+            "INSERT INTO layout_items (layout_id, plant_id) VALUES (?, ?)",
+            ((i % (ROWS // 10) + 1, i % ROWS + 1) for i in range(ROWS))
+        )
+    conn.execute("ANALYZE")
+
+@pytest.fixture(scope="module")
+def db(tmp_path_factory):
+    data_dir = str(tmp_path_factory.mktemp("data"))
+    glib = database.GLib
+    database.GLib = types.SimpleNamespace(get_user_data_dir=lambda: data_dir)
+    try:
+        db = database.Database()
+    finally:
+        database.GLib = glib
+    _seed(db.conn)
+    yield db
+    db.close()
+
+def _traced(db, call):
+    """The statements call(db) runs, triggers' included."""
+    statements = []
+    db.conn.set_trace_callback(statements.append)
+    try:
+        call(db)
+    finally:
+        db.conn.set_trace_callback(None)
+    # Trigger bodies are reported as "-- TRIGGER ..." followed by their statements
+    return [s.strip() for s in statements if not s.lstrip().startswith("--")]
+
+def _plan(conn, sql):
+    return [row[3] for row in conn.execute("EXPLAIN QUERY PLAN " + sql)]
+
+def test_every_query_method_is_checked():
+    public = {name for name in dir(database.Database) if not name.startswith("_")}
+    assert public - NOT_QUERIES == set(CALLS)
+
+@pytest.mark.parametrize("method", sorted(CALLS))
+def test_no_full_scans(db, method):
+    statements = _traced(db, CALLS[method])
+    assert statements, f"{method} ran no SQL"
+    for sql in statements:
+        if not re.match(r"(SELECT|INSERT|UPDATE|DELETE|WITH)\b", sql, re.IGNORECASE):
+            continue  # BEGIN, COMMIT, PRAGMA...
+        plan = _plan(db.conn, sql)
+        for detail in plan:
+            if method not in WHOLE_TABLE_READS:
+                assert not _FULL_SCAN.match(detail), f"{method} scans a table:\n{sql}\n{plan}"
+            assert not _TEMP_SORT.search(detail), f"{method} sorts without an index:\n{sql}\n{plan}"
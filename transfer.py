@@ -0,0 +1,139 @@
+"""
+Streaming NDJSON export and import of a whole Flora database.
+
+The file starts with a header line, followed by one line per row:
+
+    {"format": "flora-ndjson", "version": 1, "schema": 5}
+    {"table": "favorites", "row": {"id": 143120, "common_name": ...}}
+
+Both directions work one row at a time, so memory use stays flat no matter
+how large the garden, journal or reminder history is.
+"""
+import itertools
+import json
+import sys
+
+from database import Database, to_julian_day
+
+FORMAT = "flora-ndjson"
+VERSION = 1
+
+# Parents before children, so ids can be remapped in a single pass
+TABLES = ["favorites", "care_events", "layouts", "layout_items", "reminders", "journal"]
+
+def export_ndjson(db, out):
+    """Writes every table to the text stream out. Returns rows written per table."""
+    conn = db.conn
+    counts = {}
+    # One read transaction so the export is a consistent snapshot
+    conn.execute("BEGIN")
+    try:
+        schema = conn.execute("PRAGMA user_version").fetchone()[0]
+        out.write(json.dumps({"format": FORMAT, "version": VERSION, "schema": schema}) + "\n")
+        for table in TABLES:
+            cursor = conn.execute(f"SELECT * FROM {table}")
+            cols = [d[0] for d in cursor.description]
+            counts[table] = 0
+            for row in cursor:
+                out.write(json.dumps({"table": table, "row": dict(zip(cols, row))}) + "\n")
+                counts[table] += 1
+    finally:
+        conn.commit()
+    return counts
+
+def import_ndjson(db, infile, batch_size=5000):
+    """
+    Merges an export into db, committing every batch_size rows.
+
+    Plant ids come from the plant databases (or are manual timestamps), so
+    they are kept and plants already present are left alone, along with
+    their care events and layout items, which the database already has or
+    which belong to a different plant. All other rows get fresh ids;
+    layout items follow their layout's new id. Returns rows imported per
+    table.
+    """
+    header = json.loads(infile.readline() or "{}")
+    if header.get("format") != FORMAT:
+        raise ValueError("Not a Flora export file")
+    if header.get("version", 0) > VERSION:
+        raise ValueError("Export was made by a newer version of Flora")
+
+    columns = {t: _table_columns(db, t) for t in TABLES}
+    layout_ids = {}
+    ignored_plants = set()
+    counts = dict.fromkeys(TABLES, 0)
+
+    records = (json.loads(line) for line in infile if line.strip())
+    while batch := list(itertools.islice(records, batch_size)):
+        with db.transaction() as conn:
+            for record in batch:
+                table, row = record.get("table"), record.get("row")
+                if table not in columns or not isinstance(row, dict):
+                    continue
+                if _import_row(conn, table, row, columns[table], layout_ids, ignored_plants):
+                    counts[table] += 1
+            db.invalidate_cache(TABLES)
+
+    return counts
+
+def _table_columns(db, table):
+    return [r[1] for r in db.conn.execute(f"PRAGMA table_info({table})")]
+
+# Tables whose rows belong to a plant, by plant_id
+PLANT_CHILDREN = {"care_events", "layout_items"}
+
+def _import_row(conn, table, row, columns, layout_ids, ignored_plants):
+    old_id = row.get("id")
+    if table in PLANT_CHILDREN and row.get("plant_id") in ignored_plants:
+        return False
+    if table == "layout_items":
+        if row.get("layout_id") not in layout_ids:
+            return False
+        row = {**row, "layout_id": layout_ids[row["layout_id"]]}
+    if table == "reminders" and "due_day" not in row:
+        # Exports from before due dates were stored as day numbers
+        try:
+            row = {**row, "due_day": to_julian_day(str(row.get("due_date")))}
+        except ValueError:
+            return False
+
+    # Unknown columns (from a newer schema) are dropped
+    keep = [c for c in columns if c in row and (table == "favorites" or c != "id")]
+    names = ", ".join(keep)
+    params = ", ".join("?" for _ in keep)
+    verb = "INSERT OR IGNORE" if table == "favorites" else "INSERT"
+    cursor = conn.execute(f"{verb} INTO {table} ({names}) VALUES ({params})", [row[c] for c in keep])
+
+    if table == "layouts":
+        layout_ids[old_id] = cursor.lastrowid
+    if table == "favorites" and cursor.rowcount == 0:
+        ignored_plants.add(old_id)
+    return cursor.rowcount > 0
+
+def main(argv):
+    """Entry point for `flora export FILE` and `flora import FILE` ("-" for stdio)."""
+    if len(argv) != 2 or argv[0] not in ("export", "import"):
+        print("usage: flora export|import FILE", file=sys.stderr)
+        return 2
+
+    command, path = argv
+    db = Database()
+    try:
+        if command == "export":
+            if path == "-":
+                counts = export_ndjson(db, sys.stdout)
+            else:
+                with open(path, "w", encoding="utf-8") as f:
+                    counts = export_ndjson(db, f)
+        else:
+            if path == "-":
+                counts = import_ndjson(db, sys.stdin)
+            else:
+                with open(path, "r", encoding="utf-8") as f:
+                    counts = import_ndjson(db, f)
+    finally:
+        db.close()
+
+    summary = ", ".join(f"{n} {t}" for t, n in counts.items())
+    print(f"{command.capitalize()}ed {summary}", file=sys.stderr)
+    return 0
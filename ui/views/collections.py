@@ -3,6 +3,8 @@ import os
 import hashlib
 from gi.repository import Gtk, Adw, Gio, GLib, Pango, Gdk
 
+from .paging import PagedLoader
+
 class CollectionsView:
     def __init__(self, window, db, builder):
         self.window = window
@@ -18,57 +20,68 @@ class CollectionsView:
         self.empty_add_btn.connect("clicked", self._on_add_clicked)
         self.list_box.connect("row-activated", self._on_row_activated)
 
+        self.loader = PagedLoader(
+            db, self.list_box,
+            fetch_page=self._fetch_layouts_page,
+            next_cursor=lambda cursor, rows: (rows[-1][0].created_date, rows[-1][0].id),
+            on_rows=self._on_layouts_page
+        )
+
     def refresh(self):
-        # Clear list
-        while child := self.list_box.get_row_at_index(0):
-            self.list_box.remove(child)
+        self.loader.reset()
+
+    def _fetch_layouts_page(self, cursor, limit):
+        # Runs on the database worker; cursor is the last (created_date, id) shown
+        before_created, before_id = cursor or (None, None)
+        layouts = self.db.get_layouts_page(before_created, before_id, limit)
+        return [(layout, self.db.get_layout_items(layout.id)) for layout in layouts]
+
+    def _on_layouts_page(self, layouts, first):
+        if first:
+            # Clear list
+            while child := self.list_box.get_row_at_index(0):
+                self.list_box.remove(child)
+            self.stack.set_visible_child_name("list" if layouts else "empty")
+
+        for layout, items in layouts:
+            l_id, name, l_type = layout.id, layout.name, layout.type
+            row = Adw.ExpanderRow(title=name, subtitle=f"{l_type} • Created {layout.created_date}")
+            row.layout_id = l_id
+            row.layout_name = name
+            row.layout_type = l_type
             
-        layouts = self.db.get_layouts()
-        if not layouts:
-            self.stack.set_visible_child_name("empty")
-        else:
-            self.stack.set_visible_child_name("list")
-            for l_id, name, l_type, date in layouts:
-                row = Adw.ExpanderRow(title=name, subtitle=f"{l_type} • Created {date}")
-                row.layout_id = l_id
-                row.layout_name = name
-                row.layout_type = l_type
-                
-                # Add Edit Button Suffix
-                edit_btn = Gtk.Button(icon_name="document-edit-symbolic")
-                edit_btn.add_css_class("flat")
-                edit_btn.set_tooltip_text("Edit Collection")
-                edit_btn.connect("clicked", lambda b, _lid=l_id, _n=name, _t=l_type: self._on_edit_collection(b, _lid, _n, _t))
-                row.add_action(edit_btn)
+            # Add Edit Button Suffix
+            edit_btn = Gtk.Button(icon_name="document-edit-symbolic")
+            edit_btn.add_css_class("flat")
+            edit_btn.set_tooltip_text("Edit Collection")
+            edit_btn.connect("clicked", lambda b, _lid=l_id, _n=name, _t=l_type: self._on_edit_collection(b, _lid, _n, _t))
+            row.add_action(edit_btn)
 
-                # Add Delete Button Suffix
-                delete_btn = Gtk.Button(icon_name="user-trash-symbolic")
-                delete_btn.add_css_class("flat")
-                delete_btn.add_css_class("destructive-action")
-                delete_btn.set_tooltip_text("Delete Collection")
-                # Using lambda with explicit arguments to capture values correctly in loop
-                delete_btn.connect("clicked", lambda b, _lid=l_id: self._on_delete_collection(b, _lid))
-                row.add_action(delete_btn)
+            # Add Delete Button Suffix
+            delete_btn = Gtk.Button(icon_name="user-trash-symbolic")
+            delete_btn.add_css_class("flat")
+            delete_btn.add_css_class("destructive-action")
+            delete_btn.set_tooltip_text("Delete Collection")
+            # Using lambda with explicit arguments to capture values correctly in loop
+            delete_btn.connect("clicked", lambda b, _lid=l_id: self._on_delete_collection(b, _lid))
+            row.add_action(delete_btn)
 
-                # Show assigned plants in expanded list
-                items = self.db.get_layout_items(l_id)
-                if items:
-                    for item in items:
-                        # item: id, plant_id, common_name, image_url
-                        p_name = item[2]
-                        plant_row = Adw.ActionRow(title=p_name)
-                        
-                        # Just an icon, no heavy image loading as requested
-                        icon = Gtk.Image(icon_name="emoji-nature-symbolic")
-                        plant_row.add_prefix(icon)
-                        
-                        row.add_row(plant_row)
-                else:
-                    empty_row = Adw.ActionRow(title="No plants assigned")
-                    empty_row.set_sensitive(False)
-                    row.add_row(empty_row)
-                
-                self.list_box.append(row)
+            # Show assigned plants in expanded list
+            if items:
+                for item in items:
+                    plant_row = Adw.ActionRow(title=item.common_name)
+                    
+                    # Just an icon, no heavy image loading as requested
+                    icon = Gtk.Image(icon_name="emoji-nature-symbolic")
+                    plant_row.add_prefix(icon)
+                    
+                    row.add_row(plant_row)
+            else:
+                empty_row = Adw.ActionRow(title="No plants assigned")
+                empty_row.set_sensitive(False)
+                row.add_row(empty_row)
+            
+            self.list_box.append(row)
 
     def _on_add_clicked(self, btn):
         dialog = Adw.AlertDialog(heading="New Garden")
@@ -211,20 +224,15 @@ class CollectionEditorView:
 
     def _refresh_plants_cache(self):
         # Fetch all favorites to populate the picker
-        self.db.cursor.execute("SELECT id, common_name FROM favorites ORDER BY common_name")
-        self.plants_cache = self.db.cursor.fetchall()
+        self.plants_cache = self.db.get_favorite_names()
 
     def _load_items(self):
         # Clear existing
         while child := self.flowbox.get_child_at_index(0):
             self.flowbox.remove(child)
 
-        items = self.db.get_layout_items(self.current_layout_id)
-        # items: id, plant_id, common_name, image_url
-        
-        for item in items:
-            p_id, name, img_url = item[1], item[2], item[3]
-            self._add_plant_card(p_id, name, img_url)
+        for item in self.db.get_layout_items(self.current_layout_id):
+            self._add_plant_card(item.plant_id, item.common_name, item.image_url)
 
     def _add_plant_card(self, plant_id, name, img_url=None):
         card = Gtk.Box(orientation=Gtk.Orientation.VERTICAL, spacing=6)
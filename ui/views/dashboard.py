@@ -1,8 +1,10 @@
 # ui/views/dashboard.py
+import datetime
 import threading
-import requests
 from gi.repository import GLib, Gtk, Adw
 
+import net
+
 class DashboardView:
     def __init__(self, app_config, db, builder):
         self.config = app_config
@@ -19,19 +21,20 @@ class DashboardView:
         self.window = builder # The builder passed is the PlantWindow instance
 
     def refresh(self):
-        self._update_garden_status()
-        self._refresh_reminders()
-        self._refresh_water_tasks()
+        self._refresh_summary()
         threading.Thread(target=self._fetch_weather, daemon=True).start()
 
-    def _update_garden_status(self):
-        # We need a new method in database.py for this, or execute directly
-        # Ideally: count = self.db.get_plant_count()
-        self.db.cursor.execute("SELECT COUNT(*) FROM favorites")
-        plant_count = self.db.cursor.fetchone()[0]
-        
-        coll_count = self.db.get_collections_count()
+    def _refresh_summary(self):
+        self.db.submit(self.db.dashboard_summary, 3, callback=self._on_summary_loaded)
+
+    def _on_summary_loaded(self, summary):
+        self._update_garden_status(summary["plant_count"], summary["collection_count"])
+        self._show_reminders(summary["reminders"])
+        overdue = summary["overdue_count"]
+        self.reminders_group.set_description(f"{overdue} overdue" if overdue else None)
+        self._show_water_tasks(summary["plants_to_water"])
 
+    def _update_garden_status(self, plant_count, coll_count):
         if plant_count == 0 and coll_count == 0:
             self.status_row.set_title("Your Garden is Empty")
             self.status_row.set_subtitle("Head over to Search to find your first plant!")
@@ -48,7 +51,7 @@ class DashboardView:
             city = self.config.get("city", "Winnipeg")
             # Step 1: Geocoding
             geo_url = f"https://geocoding-api.open-meteo.com/v1/search?name={city}&count=1&language=en&format=json"
-            geo_resp = requests.get(geo_url, timeout=5).json()
+            geo_resp = net.get(geo_url, timeout=5).json()
             
             if not geo_resp.get("results"):
                 GLib.idle_add(self.weather_row.set_subtitle, f"City '{city}' not found")
@@ -60,7 +63,7 @@ class DashboardView:
             # Step 2: Weather
             # Request daily precipitation probability max to get chance of rain
             weather_url = f"https://api.open-meteo.com/v1/forecast?latitude={lat}&longitude={lon}&current_weather=true&daily=precipitation_probability_max&timezone=auto"
-            response = requests.get(weather_url, timeout=5).json()
+            response = net.get(weather_url, timeout=5).json()
             
             if "current_weather" in response:
                 current = response["current_weather"]
@@ -87,55 +90,51 @@ class DashboardView:
         self.weather_icon.set_from_icon_name(icon_name)
         return False
 
-    def _refresh_reminders(self):
+    def _show_reminders(self, reminders):
         self._clear_list(self.reminders_list)
-        reminders = self.db.get_reminders()[:3]
         if not reminders:
             self.reminders_list.append(Adw.ActionRow(title="No upcoming tasks"))
         else:
-            for r_id, task, date in reminders:
-                row = Adw.ActionRow(title=task)
-                row.set_subtitle(f"Due: {date}")
+            today = datetime.date.today().isoformat()
+            for reminder in reminders:
+                row = Adw.ActionRow(title=reminder.task)
+                row.set_subtitle(f"Overdue: {reminder.due}" if reminder.due < today else f"Due: {reminder.due}")
                 row.add_prefix(Gtk.Image(icon_name="task-due-symbolic"))
                 
                 # Add check button
                 btn = Gtk.Button(icon_name="feather-check-symbolic", valign=Gtk.Align.CENTER)
                 btn.add_css_class("flat")
                 btn.set_tooltip_text("Mark as Completed")
-                btn.connect("clicked", self._on_complete_reminder, r_id)
+                btn.connect("clicked", self._on_complete_reminder, reminder.id)
                 row.add_suffix(btn)
                 
                 self.reminders_list.append(row)
 
     def _on_complete_reminder(self, button, r_id):
         self.db.complete_reminder(r_id)
-        self._refresh_reminders()
+        self._refresh_summary()
         self.window.show_toast("Task completed")
 
-    def _refresh_water_tasks(self):
+    def _show_water_tasks(self, plants):
         self._clear_list(self.water_list)
-        # Ideally, move this query to database.py
-        self.db.cursor.execute("SELECT id, common_name, last_watered FROM favorites ORDER BY last_watered ASC LIMIT 3")
-        plants = self.db.cursor.fetchall()
-        for p_id, name, last in plants:
-            row = Adw.ActionRow(title=name)
-            row.set_subtitle(f"Last watered: {last or 'Never'}")
+        for plant in plants:
+            row = Adw.ActionRow(title=plant.common_name)
+            last_str = datetime.date.fromtimestamp(plant.last_watered).isoformat() if plant.last_watered else "Never"
+            row.set_subtitle(f"Last watered: {last_str}")
             row.add_prefix(Gtk.Image(icon_name="leaf-symbolic"))
             
             # Add water button
             btn = Gtk.Button(icon_name="rain-symbolic", valign=Gtk.Align.CENTER)
             btn.add_css_class("flat")
             btn.set_tooltip_text("Water Plant")
-            btn.connect("clicked", self._on_water_plant, p_id)
+            btn.connect("clicked", self._on_water_plant, plant.id)
             row.add_suffix(btn)
             
             self.water_list.append(row)
 
     def _on_water_plant(self, button, p_id):
-        import datetime
-        now = datetime.date.today().strftime("%Y-%m-%d")
-        self.db.water_plant(p_id, now)
-        self._refresh_water_tasks()
+        self.db.water_plant(p_id)
+        self._refresh_summary()
         self.window.show_toast("Plant watered")
 
     def _clear_list(self, listbox):
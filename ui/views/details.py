@@ -1,10 +1,12 @@
 import threading
-import requests
 import hashlib
 import os
-from datetime import datetime
+from dataclasses import replace
+from datetime import datetime, timedelta
 from gi.repository import GLib, Gtk, Adw, Gdk, Gio
 
+import net
+
 class PlantDetailView:
     def __init__(self, window, db, builder):
         self.window = window  # Reference to main window for toasts/navigation
@@ -44,6 +46,10 @@ class PlantDetailView:
         self.image.add_controller(click_gesture)
         
         self.new_image_path = None
+
+        # Bumped for every plant shown; work for earlier ones is dropped
+        self.generation = 0
+        self.cancel_token = None
         
         self._connect_signals()
 
@@ -55,33 +61,34 @@ class PlantDetailView:
         self.btn_water.connect("clicked", self._on_water_clicked)
         self.dropdown.connect("notify::selected-item", self._on_dropdown_changed)
 
-    def load_plant(self, plant_data):
-        """Populates the view with plant data and checks DB for existing records."""
+    def load_plant(self, plant):
+        """Populates the view with a Plant and checks DB for existing records."""
         self.new_image_path = None
-        self.current_plant = plant_data
-        p = plant_data
+        self.current_plant = plant
+        p = plant
+        generation, cancel = self._supersede()
         
         # 1. Populate Static Info
-        self.name_lbl.set_text(p.get('common_name') or "")
-        self.family_lbl.set_text(p.get('family_common_name') or p.get('family') or "")
-        self.science_lbl.set_text(p.get('scientific_name') or "")
-        self.year_lbl.set_text(str(p.get('year')) if p.get('year') else "")
-        self.bib_lbl.set_text(p.get('bibliography') or "")
+        self.name_lbl.set_text(p.common_name or "")
+        self.family_lbl.set_text(p.family or "")
+        self.science_lbl.set_text(p.scientific_name or "")
+        self.year_lbl.set_text(p.year or "")
+        self.bib_lbl.set_text(p.bibliography or "")
         
         # New fields defaults
-        self.genus_lbl.set_text(p.get('genus') or "")
+        self.genus_lbl.set_text(p.genus or "")
         self.edible_lbl.set_text("")
         self.vegetable_lbl.set_text("")
 
         # Fetch more details if available
-        threading.Thread(target=self._fetch_full_details, args=(p,), daemon=True).start()
+        threading.Thread(target=self._fetch_full_details, args=(p, generation, cancel), daemon=True).start()
 
         # 2. Load Image (Threaded)
         # Reset avatar first
         self.image.set_paintable(None)
         
-        if p.get('image_url'):
-            threading.Thread(target=self._load_image, args=(p['image_url'],), daemon=True).start()
+        if p.image_url:
+            threading.Thread(target=self._load_image, args=(p.image_url, generation, cancel), daemon=True).start()
         else:
              # Load default image
             try:
@@ -91,17 +98,12 @@ class PlantDetailView:
                 pass
 
         # 3. Check Database State (Is this in My Garden?)
-        # We access the cursor directly or we could add a method in database.py
-        self.db.cursor.execute(
-            "SELECT added_date, notes, last_watered, habit, harvest, light, common_name, scientific_name, family, genus, year, bibliography, edible, vegetable FROM favorites WHERE id=?", 
-            (p['id'],)
-        )
-        record = self.db.cursor.fetchone()
+        record = self.db.get_favorite(p.id)
 
         if record:
             self._populate_existing_plant(record)
             self.dropdown.set_visible(True)
-            self._populate_dropdown(p['id'])
+            self._populate_dropdown(p.id)
         else:
             self._populate_new_plant(p)
             self.dropdown.set_visible(False)
@@ -109,33 +111,53 @@ class PlantDetailView:
         # 5. Show the page
         self.main_stack.set_visible_child_name("details_page")
 
+    def _supersede(self):
+        """Cancels the downloads for the plant shown before. Returns the new generation and token."""
+        if self.cancel_token:
+            self.cancel_token.cancel()
+        # Its image load can no longer stop the spinner, since that's ignored now
+        self.spinner.set_spinning(False)
+        self.generation += 1
+        self.cancel_token = net.CancelToken()
+        return self.generation, self.cancel_token
+
+    def _is_current(self, generation):
+        return generation == self.generation
+
     def _populate_existing_plant(self, record):
-        added_str, notes, watered, habit, harvest, light, common, sci, family, genus, year, bib, edible, veg = record
-        
         self.timeline_group.set_visible(True)
-        self.date_added_row.set_subtitle(f"Added on {added_str}")
-        self._calculate_days_owned(added_str)
+        self.date_added_row.set_subtitle(f"Added on {record.added_date}")
+        self._calculate_days_owned(record.added_date)
         
-        self.notes_view.get_buffer().set_text(notes or "")
-        self.watered_row.set_subtitle(f"Last watered: {watered or 'Never'}")
-        self.habit_entry.set_text(habit or "")
-        self.harvest_entry.set_text(harvest or "")
-        self.light_entry.set_text(light or "")
+        self.notes_view.get_buffer().set_text(record.notes or "")
+        self._update_watered_row(record.last_watered)
+        self.habit_entry.set_text(record.habit or "")
+        self.harvest_entry.set_text(record.harvest or "")
+        self.light_entry.set_text(record.light or "")
 
         # Populate new editable fields
-        self.name_lbl.set_text(common or "")
-        self.science_lbl.set_text(sci or "")
-        self.family_lbl.set_text(family or "")
-        self.genus_lbl.set_text(genus or "")
-        self.year_lbl.set_text(year or "")
-        self.bib_lbl.set_text(bib or "")
-        self.edible_lbl.set_text(edible or "")
-        self.vegetable_lbl.set_text(veg or "")
+        self.name_lbl.set_text(record.common_name or "")
+        self.science_lbl.set_text(record.scientific_name or "")
+        self.family_lbl.set_text(record.family or "")
+        self.genus_lbl.set_text(record.genus or "")
+        self.year_lbl.set_text(record.year or "")
+        self.bib_lbl.set_text(record.bibliography or "")
+        self.edible_lbl.set_text(record.edible or "")
+        self.vegetable_lbl.set_text(record.vegetable or "")
         
         # UI State
         self.btn_fav.set_icon_name("starred-symbolic")
         self.btn_delete.set_visible(True)
 
+    def _update_watered_row(self, last_watered):
+        if not last_watered:
+            self.watered_row.set_subtitle("Last watered: Never")
+            return
+        last_str = datetime.fromtimestamp(last_watered).strftime("%Y-%m-%d %H:%M")
+        recent = self.db.count_care_events(self.current_plant.id, "water", datetime.now() - timedelta(days=30))
+        times = "time" if recent == 1 else "times"
+        self.watered_row.set_subtitle(f"Last watered: {last_str} • {recent} {times} in the last 30 days")
+
     def _populate_new_plant(self, p):
         self.timeline_group.set_visible(False)
         self.date_added_row.set_subtitle("Not in collection")
@@ -144,9 +166,9 @@ class PlantDetailView:
         self.watered_row.set_subtitle("Never logged")
         
         # Try to fill defaults from API data if available
-        self.habit_entry.set_text(p.get('growth_habit') or "")
-        self.harvest_entry.set_text(str(p.get('days_to_harvest')) if p.get('days_to_harvest') else "")
-        self.light_entry.set_text(str(p.get('light')) if p.get('light') else "")
+        self.habit_entry.set_text(p.habit or "")
+        self.harvest_entry.set_text(p.harvest or "")
+        self.light_entry.set_text(p.light or "")
         
         # New fields (already set in load_plant, but ensuring "Unknown" isn't used)
         
@@ -162,32 +184,37 @@ class PlantDetailView:
         except:
             self.days_owned_row.set_subtitle("Unknown duration")
 
-    def _fetch_full_details(self, p):
+    def _fetch_full_details(self, p, generation, cancel):
         try:
             token = self.window.get_application().config.get("api_key")
             provider = self.window.get_application().config.get("api_provider", "trefle")
             
-            if not p.get('id'):
+            if not p.id:
                 return
 
             if provider == "trefle":
-                url = f"https://trefle.io/api/v1/plants/{p['id']}?token={token}"
-                res = requests.get(url, timeout=10)
+                url = f"https://trefle.io/api/v1/plants/{p.id}?token={token}"
+                res = net.get(url, cancel=cancel)
                 if res.status_code == 200:
                     data = res.json().get('data', {})
-                    GLib.idle_add(self._update_ui_with_details, data, "trefle")
+                    GLib.idle_add(self._update_ui_with_details, data, "trefle", generation)
             
             elif provider == "perenual":
-                url = f"https://perenual.com/api/v2/species/details/{p['id']}?key={token}"
-                res = requests.get(url, timeout=10)
+                url = f"https://perenual.com/api/v2/species/details/{p.id}?key={token}"
+                res = net.get(url, cancel=cancel)
                 if res.status_code == 200:
                     data = res.json()
-                    GLib.idle_add(self._update_ui_with_details, data, "perenual")
+                    GLib.idle_add(self._update_ui_with_details, data, "perenual", generation)
                     
+        except net.Cancelled:
+            pass
         except Exception as e:
             print(f"Details fetch error: {e}")
 
-    def _update_ui_with_details(self, data, provider):
+    def _update_ui_with_details(self, data, provider, generation):
+        if not self._is_current(generation):
+            return False  # Another plant is shown now
+
         # Only update if the field is empty to avoid overwriting user edits on saved plants?
         # But this is called for new plants too.
         # Ideally, we check if the field is empty.
@@ -260,8 +287,8 @@ class PlantDetailView:
         hash_name = hashlib.md5(url.encode('utf-8')).hexdigest()
         return os.path.join(cache_base, hash_name)
 
-    def _load_image(self, url):
-        GLib.idle_add(self.spinner.set_spinning, True)
+    def _load_image(self, url, generation, cancel):
+        GLib.idle_add(self._set_spinning, True, generation)
         try:
             texture = None
             if url.startswith("file://"):
@@ -271,48 +298,46 @@ class PlantDetailView:
             else:
                 cache_path = self._get_cache_path(url)
                 
-                # Check cache first
-                if os.path.exists(cache_path):
-                    f = Gio.File.new_for_path(cache_path)
-                    try:
-                        texture = Gdk.Texture.new_from_file(f)
-                    except Exception as e:
-                        print(f"Failed to load cached image: {e}")
-                        # If cache load fails, try downloading again (proceeds to download block)
-                
-                if not texture:
-                    # Download if not in cache or cache load failed
-                    headers = {'User-Agent': 'Flora/0.1 (https://github.com/cadmiumcmyk/Flora; your@email.com)'}
-                    response = requests.get(url, headers=headers, timeout=10)
-                    if response.status_code == 200:
-                        # Save to cache
-                        with open(cache_path, 'wb') as f:
-                            f.write(response.content)
-                        
-                        # Load from file
-                        f = Gio.File.new_for_path(cache_path)
-                        texture = Gdk.Texture.new_from_file(f)
-                    else:
-                        raise Exception("Download failed")
+                # Downloads or revalidates the cached copy as needed
+                if not net.download(url, cache_path, cancel=cancel):
+                    raise Exception("Download failed")
+
+                f = Gio.File.new_for_path(cache_path)
+                try:
+                    texture = Gdk.Texture.new_from_file(f)
+                except Exception as e:
+                    print(f"Failed to load cached image: {e}")
+                    # Fetched again from scratch next time
+                    os.remove(cache_path)
             
             if texture:
-                GLib.idle_add(lambda: self._set_texture(texture))
+                GLib.idle_add(self._set_texture, texture, generation)
             else:
                 raise Exception("No texture loaded")
                 
+        except net.Cancelled:
+            pass
         except Exception as e:
             print(f"Image load error: {e}")
-            GLib.idle_add(self.spinner.set_spinning, False)
             # Load default image
             try:
                 texture = Gdk.Texture.new_from_resource("/com/github/cadmiumcmyk/Flora/resources/flora-flowers.svg")
-                GLib.idle_add(self.image.set_paintable, texture)
+                GLib.idle_add(self._set_texture, texture, generation)
             except:
-                pass
+                GLib.idle_add(self._set_spinning, False, generation)
 
-    def _set_texture(self, texture):
-        self.image.set_paintable(texture)
+    def _set_texture(self, texture, generation):
+        if not self._is_current(generation):
+            return False  # Another plant is shown now
         self.spinner.set_spinning(False)
+        if not self.new_image_path:  # Keep a photo the user just picked
+            self.image.set_paintable(texture)
+        return False
+
+    def _set_spinning(self, spinning, generation):
+        if self._is_current(generation):
+            self.spinner.set_spinning(spinning)
+        return False
 
     # --- Actions ---
 
@@ -323,7 +348,7 @@ class PlantDetailView:
         notes = buf.get_text(buf.get_start_iter(), buf.get_end_iter(), True)
         
         success = self.db.add_favorite(
-            p['id'], 
+            p.id, 
             self.name_lbl.get_text(),
             self.science_lbl.get_text(),
             self.family_lbl.get_text(),
@@ -332,7 +357,7 @@ class PlantDetailView:
             self.bib_lbl.get_text(),
             self.edible_lbl.get_text(),
             self.vegetable_lbl.get_text(),
-            p.get('image_url'), 
+            p.image_url, 
             self.habit_entry.get_text(), 
             self.harvest_entry.get_text(), 
             self.light_entry.get_text(), 
@@ -343,7 +368,7 @@ class PlantDetailView:
             self.btn_fav.set_icon_name("starred-symbolic")
             self.btn_delete.set_visible(True)
             self.dropdown.set_visible(True)
-            self._populate_dropdown(p['id'])
+            self._populate_dropdown(p.id)
             self.window.show_toast("Added to Garden!")
         else:
             self.window.show_toast("Already in Garden")
@@ -356,7 +381,7 @@ class PlantDetailView:
         new_url = self.new_image_path if self.new_image_path else None
         
         if self.db.update_favorite(
-            self.current_plant['id'], 
+            self.current_plant.id, 
             self.name_lbl.get_text(),
             self.science_lbl.get_text(),
             self.family_lbl.get_text(),
@@ -372,7 +397,7 @@ class PlantDetailView:
             image_url=new_url
         ):
             if new_url:
-                self.current_plant['image_url'] = new_url
+                self.current_plant = replace(self.current_plant, image_url=new_url)
             self.window.show_toast("Changes saved")
 
     def _on_image_pressed(self, gesture, n_press, x, y):
@@ -413,14 +438,14 @@ class PlantDetailView:
 
     def _on_water_clicked(self, btn):
         if not self.current_plant: return
-        now = datetime.now().strftime("%Y-%m-%d %H:%M")
-        if self.db.water_plant(self.current_plant['id'], now):
-            self.watered_row.set_subtitle(f"Last watered: {now}")
+        now = datetime.now()
+        if self.db.water_plant(self.current_plant.id, now):
+            self._update_watered_row(now.timestamp())
             self.window.show_toast("Watered!")
 
     def _on_delete_clicked(self, btn):
         if not self.current_plant: return
-        p_name = self.current_plant.get('common_name') or "this plant"
+        p_name = self.current_plant.common_name or "this plant"
         
         dialog = Adw.MessageDialog(
             transient_for=self.window,
@@ -437,7 +462,7 @@ class PlantDetailView:
     def _confirm_delete(self, dialog, response):
         if response == "remove":
             # Remove cached image if it exists
-            image_url = self.current_plant.get('image_url')
+            image_url = self.current_plant.image_url
             if image_url and not image_url.startswith("file://"):
                 cache_path = self._get_cache_path(image_url)
                 if os.path.exists(cache_path):
@@ -446,8 +471,8 @@ class PlantDetailView:
                     except Exception as e:
                         print(f"Failed to delete cache file: {e}")
 
-            if self.db.remove_favorite(self.current_plant['id']):
-                self.window.show_toast(f"Removed {self.current_plant.get('common_name')}")
+            if self.db.remove_favorite(self.current_plant.id):
+                self.window.show_toast(f"Removed {self.current_plant.common_name}")
                 # Refresh garden view
                 self.window.garden_view.refresh()
                 self._go_back(None)
@@ -458,16 +483,14 @@ class PlantDetailView:
         self.dropdown.freeze_notify()
         
         layouts = self.db.get_layouts()
-        # Layouts: id, name, type, date
         
         # Prepare list: ["None"] + [Name (Type)]
         items = ["None"]
         layout_ids = [None] # Corresponds to items indices
         
-        for l in layouts:
-            l_id, name, l_type = l[0], l[1], l[2]
-            items.append(f"{name} ({l_type})")
-            layout_ids.append(l_id)
+        for layout in layouts:
+            items.append(f"{layout.name} ({layout.type})")
+            layout_ids.append(layout.id)
             
         model = Gtk.StringList.new(items)
         self.dropdown.set_model(model)
@@ -497,9 +520,8 @@ class PlantDetailView:
         if idx == Gtk.INVALID_LIST_POSITION: return
         
         # Ensure plant is saved first
-        p_id = self.current_plant['id']
-        self.db.cursor.execute("SELECT id FROM favorites WHERE id=?", (p_id,))
-        if not self.db.cursor.fetchone():
+        p_id = self.current_plant.id
+        if not self.db.is_favorite(p_id):
             # If user tries to assign unsaved plant, warn and revert?
             # Or better, just return and let them save.
             self.window.show_toast("Please save plant to garden first")
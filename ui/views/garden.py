@@ -1,16 +1,19 @@
 import os
 import threading
-import requests
 import hashlib
 from datetime import datetime
 from gi.repository import Gtk, Adw, Gio, Gdk, GLib, Pango, GdkPixbuf
 
+import net
+from .paging import PagedLoader
+
 class GardenView:
     def __init__(self, window, db, builder, on_plant_selected_callback):
         self.window = window # Needed for FileChooser dialog parent
         self.db = db
         self.on_plant_selected = on_plant_selected_callback
         self.selected_manual_image_path = None
+        self.matching_ids = None  # None when no search is active
 
         # --- UI References ---
         self.favorites_list = builder.favorites_list
@@ -29,30 +32,25 @@ class GardenView:
         self.search_entry.connect("search-changed", self._on_search_changed)
         self.favorites_list.set_filter_func(self._filter_func)
 
+        self.loader = PagedLoader(
+            db, self.favorites_list,
+            fetch_page=self.db.get_favorites_page,
+            next_cursor=lambda cursor, rows: rows[-1].id,
+            on_rows=self._on_favorites_page
+        )
+
     def refresh(self):
         """Refreshes the list of plants in the garden."""
-        self._clear_list()
-        
-        # Fetch info needed for the list and details
-        # We fetch all columns to ensure detail view gets full info
-        cols = ["id", "common_name", "scientific_name", "family", "genus", "year", "bibliography", "edible", "vegetable", "image_url", "habit", "harvest", "light", "notes", "added_date", "last_watered"]
-        query = "SELECT " + ", ".join(cols) + " FROM favorites"
-        
-        self.db.cursor.execute(query)
-        rows = self.db.cursor.fetchall()
-        
-        if not rows:
-            self.stack.set_visible_child_name("empty")
-        else:
-            self.stack.set_visible_child_name("list")
+        self.loader.reset()
+        self._on_search_changed(self.search_entry)
+
+    def _on_favorites_page(self, rows, first):
+        if first:
+            self._clear_list()
+            self.stack.set_visible_child_name("list" if rows else "empty")
         
-        for r in rows:
-            # Reconstruct the dictionary format
-            p_dict = {}
-            for i, col in enumerate(cols):
-                p_dict[col] = r[i]
-            
-            self._add_card(p_dict)
+        for plant in rows:
+            self._add_card(plant)
 
     def _add_card(self, plant):
         # Create card widget for Grid View
@@ -74,10 +72,10 @@ class GardenView:
         # image.set_vexpand(False)
         image.add_css_class("plant-card-image")
         
-        name = plant.get('common_name') or plant.get('scientific_name') or "Unknown"
+        name = plant.display_name
         
-        if plant.get('image_url'):
-            threading.Thread(target=self._load_image, args=(plant['image_url'], image), daemon=True).start()
+        if plant.image_url:
+            threading.Thread(target=self._load_image, args=(plant.image_url, image), daemon=True).start()
         else:
             self._load_default_image(image)
             
@@ -103,11 +101,21 @@ class GardenView:
             self.on_plant_selected(widget.plant_info)
 
     def _on_search_changed(self, entry):
+        self.db.submit(self._find_matches, entry.get_text(), callback=self._on_matches_found)
+
+    def _find_matches(self, query):
+        # Runs on the database worker
+        return self.db.search_favorite_ids(query) if query.strip() else None
+
+    def _on_matches_found(self, matching_ids):
+        self.matching_ids = matching_ids
+        if matching_ids is not None:
+            # Matches may be on pages that haven't been scrolled to yet
+            self.loader.load_all()
         self.favorites_list.invalidate_filter()
 
     def _filter_func(self, child):
-        query = self.search_entry.get_text().lower()
-        if not query:
+        if self.matching_ids is None:
             return True
             
         # The child of the flowbox is a GtkFlowBoxChild
@@ -116,11 +124,7 @@ class GardenView:
         if not hasattr(widget, 'plant_info'):
             return False
             
-        plant = widget.plant_info
-        name = (plant.get('common_name') or "").lower()
-        sci = (plant.get('scientific_name') or "").lower()
-        
-        return query in name or query in sci
+        return widget.plant_info.id in self.matching_ids
 
     def _show_add_plant_dialog(self, btn):
         dialog = Adw.AlertDialog(
@@ -259,27 +263,14 @@ class GardenView:
             else:
                 cache_path = self._get_cache_path(url)
                 
-                # Check cache first
-                if os.path.exists(cache_path):
+                # Downloads or revalidates the cached copy as needed
+                if net.download(url, cache_path):
                     try:
                         pixbuf = GdkPixbuf.Pixbuf.new_from_file_at_scale(cache_path, 160, 160, True)
                         texture = Gdk.Texture.new_for_pixbuf(pixbuf)
                     except:
-                        pass
-                
-                if not texture:
-                    # Download
-                    try:
-                        headers = {'User-Agent': 'Flora/0.1 (https://github.com/cadmiumcmyk/Flora; your@email.com)'}
-                        response = requests.get(url, headers=headers, timeout=10)
-                        if response.status_code == 200:
-                            with open(cache_path, 'wb') as f:
-                                f.write(response.content)
-                            
-                            pixbuf = GdkPixbuf.Pixbuf.new_from_file_at_scale(cache_path, 160, 160, True)
-                            texture = Gdk.Texture.new_for_pixbuf(pixbuf)
-                    except:
-                        pass
+                        # Fetched again from scratch next time
+                        os.remove(cache_path)
             
             if texture:
                 GLib.idle_add(target_picture.set_paintable, texture)
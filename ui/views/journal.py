@@ -1,7 +1,10 @@
 import gi
 gi.require_version('Gtk', '4.0')
 gi.require_version('Adw', '1')
-from gi.repository import Gtk, Adw
+from gi.repository import Gtk, Adw, GLib
+
+from database import SNIPPET_START, SNIPPET_END
+from .paging import PagedLoader
 
 class JournalView:
     def __init__(self, window, db, builder):
@@ -14,42 +17,94 @@ class JournalView:
         self.list_box = builder.journal_list
         self.new_btn = builder.journal_new_btn
         self.empty_btn = builder.journal_empty_add_btn
+        self.search_entry = builder.journal_search_entry
 
         # --- Connect Signals ---
         self.new_btn.connect("clicked", self._on_new_entry_clicked)
         self.empty_btn.connect("clicked", self._on_new_entry_clicked)
+        self.search_entry.connect("search-changed", self._on_search_changed)
+
+        self.query = ""
+        self.loader = PagedLoader(
+            db, self.list_box,
+            fetch_page=self._fetch_page,
+            next_cursor=self._next_cursor,
+            on_rows=self._on_page
+        )
 
     def refresh(self):
-        """Reloads the journal list from the database."""
-        self._clear_list()
-        entries = self.db.get_journal_entries()
-        
-        if not entries:
-            self.stack.set_visible_child_name("empty")
-        else:
+        """Reloads the journal list (or the current search) from the database."""
+        self.query = self.search_entry.get_text().strip()
+        self.loader.reset()
+
+    def _fetch_page(self, cursor, limit):
+        # Runs on the database worker. Searches page by offset since they're
+        # ranked; the plain list pages by its (date, id) key.
+        if self.query:
+            return self.db.search_journal(self.query, limit, cursor or 0)
+        before_date, before_id = cursor or (None, None)
+        return self.db.get_journal_page(before_date, before_id, limit)
+
+    def _next_cursor(self, cursor, rows):
+        if self.query:
+            return (cursor or 0) + len(rows)
+        return (rows[-1].date, rows[-1].id)
+
+    def _on_page(self, entries, first):
+        if first:
+            self._clear_list()
+            if not entries:
+                if self.query:
+                    row = Adw.ActionRow(title="No matching entries")
+                    row.set_sensitive(False)
+                    self.list_box.append(row)
+                else:
+                    self.stack.set_visible_child_name("empty")
+                return
             self.stack.set_visible_child_name("list")
-            for j_id, title, content, date_str in entries:
-                display_title = title if title else date_str
-                row = Adw.ActionRow(title=display_title)
-                
-                # Date Label
-                date_lbl = Gtk.Label(label=date_str)
-                date_lbl.add_css_class("dim-label")
-                row.add_suffix(date_lbl)
-                
-                # Edit button
-                edit_btn = Gtk.Button(icon_name="document-edit-symbolic", valign=Gtk.Align.CENTER)
-                edit_btn.add_css_class("flat")
-                edit_btn.connect("clicked", lambda b, jid=j_id, t=title, c=content: self.window.open_journal_editor(jid, t, c))
-                row.add_suffix(edit_btn)
-                
-                # Delete button
-                del_btn = Gtk.Button(icon_name="user-trash-symbolic", valign=Gtk.Align.CENTER)
-                del_btn.add_css_class("flat")
-                del_btn.connect("clicked", lambda b, jid=j_id, r=row: self._remove_entry(jid, r))
-                
-                row.add_suffix(del_btn)
-                self.list_box.append(row)
+
+        for entry in entries:
+            self._add_entry_row(entry)
+
+    def _snippet_markup(self, snippet):
+        # Escape the text between the match markers piece by piece; escaping
+        # the whole snippet would turn the markers into character references
+        text = snippet.replace("\n", " ")
+        pieces = text.split(SNIPPET_START)
+        markup = [GLib.markup_escape_text(pieces[0])]
+        for piece in pieces[1:]:
+            hit, _, rest = piece.partition(SNIPPET_END)
+            markup.append(f"<b>{GLib.markup_escape_text(hit)}</b>{GLib.markup_escape_text(rest)}")
+        return "".join(markup)
+
+    def _add_entry_row(self, entry):
+        row = Adw.ActionRow(title=entry.title or entry.date)
+
+        if entry.snippet:
+            row.set_subtitle(self._snippet_markup(entry.snippet))
+            row.set_subtitle_lines(2)
+        
+        # Date Label
+        date_lbl = Gtk.Label(label=entry.date)
+        date_lbl.add_css_class("dim-label")
+        row.add_suffix(date_lbl)
+        
+        # Edit button
+        edit_btn = Gtk.Button(icon_name="document-edit-symbolic", valign=Gtk.Align.CENTER)
+        edit_btn.add_css_class("flat")
+        edit_btn.connect("clicked", lambda b, e=entry: self.window.open_journal_editor(e.id, e.title, e.content))
+        row.add_suffix(edit_btn)
+        
+        # Delete button
+        del_btn = Gtk.Button(icon_name="user-trash-symbolic", valign=Gtk.Align.CENTER)
+        del_btn.add_css_class("flat")
+        del_btn.connect("clicked", lambda b, jid=entry.id, r=row: self._remove_entry(jid, r))
+        
+        row.add_suffix(del_btn)
+        self.list_box.append(row)
+
+    def _on_search_changed(self, entry):
+        self.refresh()
 
     def _on_new_entry_clicked(self, btn):
         self.window.open_journal_editor()
@@ -58,7 +113,7 @@ class JournalView:
         if self.db.delete_journal_entry(j_id):
             self.list_box.remove(row)
             if self.list_box.get_first_child() is None:
-                self.stack.set_visible_child_name("empty")
+                self.refresh()
             self.window.show_toast("Journal entry deleted")
 
     def _clear_list(self):
@@ -0,0 +1,88 @@
+from gi.repository import Gtk
+
+class PagedLoader:
+    """
+    Feeds a list widget one page at a time as the user scrolls.
+
+    fetch_page(cursor, limit) runs on the database worker and returns a list
+    of rows; cursor is None for the first page. next_cursor(cursor, rows)
+    derives the cursor for the page after rows. on_rows(rows, first) is
+    called on the main loop for every page, with first=True for the page
+    that replaces the current contents.
+    """
+
+    def __init__(self, db, widget, fetch_page, next_cursor, on_rows, page_size=50):
+        self.db = db
+        self.fetch_page = fetch_page
+        self.next_cursor = next_cursor
+        self.on_rows = on_rows
+        self.page_size = page_size
+
+        self.generation = 0
+        self.cursor = None
+        self.loading = False
+        self.exhausted = True
+        self.draining = False
+
+        # Prefetch once the user is within a viewport of the end. "changed"
+        # also fires when a page lands, so a short first page that doesn't
+        # fill the window pulls in the next one.
+        scrolled = widget.get_ancestor(Gtk.ScrolledWindow)
+        self.adjustment = scrolled.get_vadjustment() if scrolled else None
+        if self.adjustment:
+            self.adjustment.connect("value-changed", self._on_adjustment_changed)
+            self.adjustment.connect("changed", self._on_adjustment_changed)
+
+    def reset(self):
+        """Drops any pages in flight and loads the first page again."""
+        self.generation += 1
+        self.cursor = None
+        self.loading = False
+        self.exhausted = False
+        self.draining = False
+        self._load_next(first=True)
+
+    def load_more(self):
+        if not self.loading and not self.exhausted:
+            self._load_next(first=False)
+
+    def load_all(self):
+        """Keeps fetching until every page is loaded, e.g. to filter the whole list."""
+        self.draining = True
+        self.load_more()
+
+    def _load_next(self, first):
+        self.loading = True
+        generation, cursor = self.generation, self.cursor
+        self.db.submit(
+            self.fetch_page, cursor, self.page_size,
+            callback=lambda rows: self._on_page(generation, cursor, rows, first),
+            error_callback=lambda error: self._on_error(generation)
+        )
+
+    def _on_page(self, generation, cursor, rows, first):
+        if generation != self.generation:
+            return  # Superseded by a reset
+        self.loading = False
+        self.exhausted = len(rows) < self.page_size
+        if rows:
+            self.cursor = self.next_cursor(cursor, rows)
+        self.on_rows(rows, first)
+
+        if self.draining:
+            self.load_more()
+
+    def _on_error(self, generation):
+        if generation != self.generation:
+            return
+        # Scrolling would only hit the same error; the next reset() retries
+        self.loading = False
+        self.exhausted = True
+        self.draining = False
+
+    def _on_adjustment_changed(self, adjustment):
+        if adjustment is None or adjustment.get_page_size() == 0:
+            return  # Not allocated yet, e.g. on a hidden stack page
+        remaining = adjustment.get_upper() - adjustment.get_value() - adjustment.get_page_size()
+        if remaining <= adjustment.get_page_size():
+            self.load_more()
@@ -2,9 +2,11 @@ import datetime
 import uuid
 import os
 import threading
-import requests
 from gi.repository import Gtk, Adw, Gio, GLib
 
+import net
+from .paging import PagedLoader
+
 def generate_ics(reminders):
     """
     Generates an ICS string from a list of (task, date_str) tuples.
@@ -112,70 +114,87 @@ class RemindersView:
         self.export_btn.connect("clicked", self._on_export_clicked)
         self.import_btn.connect("clicked", self._on_import_clicked)
 
+        self.upcoming_loader = PagedLoader(
+            db, self.upcoming_list,
+            fetch_page=self._fetch_upcoming_page,
+            next_cursor=lambda cursor, rows: (rows[-1].due, rows[-1].id),
+            on_rows=self._on_upcoming_page
+        )
+
     def refresh(self):
         """Reloads the reminder list from the database."""
-        reminders = self.db.get_reminders()
-        
-        if not reminders:
-            self.root_stack.set_visible_child_name("empty")
-        else:
-            self.root_stack.set_visible_child_name("content")
-            self._update_daily_list(reminders)
-            self._update_upcoming_list(reminders)
+        self.upcoming_loader.reset()
+        self._refresh_daily_list()
+        self._refresh_calendar_marks()
 
-    def _update_daily_list(self, reminders=None):
-        self._clear_list(self.daily_list)
+    def _fetch_upcoming_page(self, cursor, limit):
+        # Runs on the database worker; cursor is the last (due date, id) shown
+        after_due, after_id = cursor or (None, None)
+        return self.db.get_reminders_page(after_due, after_id, limit)
+
+    def _on_upcoming_page(self, reminders, first):
+        if first:
+            self._clear_list(self.upcoming_list)
+            if not reminders:
+                self.root_stack.set_visible_child_name("empty")
+                return
+            self.root_stack.set_visible_child_name("content")
         
+        today = datetime.date.today().isoformat()
+        for reminder in reminders:
+            row = Adw.ActionRow(title=reminder.task)
+            row.set_subtitle(f"Overdue: {reminder.due}" if reminder.due < today else f"Due: {reminder.due}")
+            
+            # Delete button
+            del_btn = Gtk.Button(icon_name="feather-check-symbolic", valign=Gtk.Align.CENTER)
+            del_btn.add_css_class("flat")
+            del_btn.connect("clicked", lambda b, rid=reminder.id, r=row: self._remove_reminder(rid, r))
+            
+            row.add_suffix(del_btn)
+            self.upcoming_list.append(row)
+
+    def _refresh_daily_list(self):
         dt = self.main_calendar.get_date()
         date_str = dt.format("%Y-%m-%d")
-        
-        if reminders is None:
-            reminders = self.db.get_reminders()
-            
-        # Filter for this date
-        day_tasks = [r for r in reminders if r[2] == date_str]
+        self.db.submit(self.db.get_reminders_on, date_str, callback=self._update_daily_list)
+
+    def _refresh_calendar_marks(self):
+        dt = self.main_calendar.get_date()
+        self.db.submit(
+            self.db.get_reminders_in_month, dt.get_year(), dt.get_month(),
+            callback=lambda tasks: self._mark_calendar_days(dt.get_year(), dt.get_month(), tasks)
+        )
+
+    def _mark_calendar_days(self, year, month, tasks):
+        dt = self.main_calendar.get_date()
+        if (dt.get_year(), dt.get_month()) != (year, month):
+            return  # The user has moved on to another month
+        self.main_calendar.clear_marks()
+        for reminder in tasks:
+            self.main_calendar.mark_day(int(reminder.due[8:10]))
+
+    def _update_daily_list(self, day_tasks):
+        self._clear_list(self.daily_list)
         
         if not day_tasks:
             self.daily_stack.set_visible_child_name("empty")
         else:
             self.daily_stack.set_visible_child_name("list")
-            for r_id, task, date in day_tasks:
-                row = Adw.ActionRow(title=task)
+            for reminder in day_tasks:
+                row = Adw.ActionRow(title=reminder.task)
                 
                 # Delete button
                 del_btn = Gtk.Button(icon_name="user-trash-symbolic", valign=Gtk.Align.CENTER)
                 del_btn.add_css_class("flat")
-                del_btn.connect("clicked", lambda b, rid=r_id, r=row: self._remove_reminder(rid, r))
+                del_btn.connect("clicked", lambda b, rid=reminder.id, r=row: self._remove_reminder(rid, r))
                 
                 row.add_suffix(del_btn)
                 self.daily_list.append(row)
 
-    def _update_upcoming_list(self, reminders):
-        self._clear_list(self.upcoming_list)
-        
-        if not reminders:
-            # We don't have a specific empty state for the list anymore,
-            # as the global empty state handles the "0 items" case.
-            # If we are here, it means we have items (handled by refresh), OR we might be in a filtered state?
-            # Actually, refresh() checks global emptiness.
-            # If we are in "content" view, we show the list.
-            pass 
-        
-        for r_id, task, date in reminders:
-            row = Adw.ActionRow(title=task)
-            row.set_subtitle(f"Due: {date}")
-            
-            # Delete button
-            del_btn = Gtk.Button(icon_name="feather-check-symbolic", valign=Gtk.Align.CENTER)
-            del_btn.add_css_class("flat")
-            del_btn.connect("clicked", lambda b, rid=r_id, r=row: self._remove_reminder(rid, r))
-            
-            row.add_suffix(del_btn)
-            self.upcoming_list.append(row)
-
     def _on_main_calendar_day_selected(self, calendar, pspec=None):
-        reminders = self.db.get_reminders()
-        self._update_daily_list(reminders)
+        self._refresh_daily_list()
+        if pspec is None or pspec.name != "day":
+            self._refresh_calendar_marks()
         
         dt = self.main_calendar.get_date()
         date_str = dt.format("%Y-%m-%d")
@@ -189,7 +208,7 @@ class RemindersView:
             city = config.get("city", "Winnipeg")
             
             geo_url = f"https://geocoding-api.open-meteo.com/v1/search?name={city}&count=1&language=en&format=json"
-            geo_resp = requests.get(geo_url, timeout=5).json()
+            geo_resp = net.get(geo_url, timeout=5).json()
             
             if not geo_resp.get("results"):
                 return
@@ -199,7 +218,7 @@ class RemindersView:
             
             weather_url = f"https://api.open-meteo.com/v1/forecast?latitude={lat}&longitude={lon}&daily=weathercode,temperature_2m_max,precipitation_probability_max&timezone=auto&start_date={date_str}&end_date={date_str}"
             
-            response = requests.get(weather_url, timeout=5).json()
+            response = net.get(weather_url, timeout=5).json()
             
             if "daily" in response:
                 daily = response["daily"]
@@ -272,11 +291,13 @@ class RemindersView:
                 date = self.dialog_date_entry.get_text()
                 
                 if task.strip() and date.strip():
-                    if self.db.add_reminder(task, date):
-                        self.refresh()
-                        self.window.show_toast("Reminder added!")
-                    else:
-                        self.window.show_toast("Error adding reminder")
+                    try:
+                        self.db.add_reminder(task, date)
+                    except ValueError:
+                        self.window.show_toast("Due date must be a valid YYYY-MM-DD date")
+                        return
+                    self.refresh()
+                    self.window.show_toast("Reminder added!")
                 else:
                     self.window.show_toast("Task and date are required")
 
@@ -303,8 +324,7 @@ class RemindersView:
                 file = d.get_file()
                 path = file.get_path()
                 reminders = self.db.get_reminders()
-                # reminders is list of (id, task, date)
-                data = [(r[1], r[2]) for r in reminders]
+                data = [(r.task, r.due) for r in reminders]
                 content = generate_ics(data)
                 try:
                     with open(path, 'w') as f:
@@ -339,10 +359,7 @@ class RemindersView:
                     with open(path, 'r') as f:
                         content = f.read()
                     reminders = parse_ics(content)
-                    count = 0
-                    for task, date in reminders:
-                        if self.db.add_reminder(task, date):
-                            count += 1
+                    count = self.db.add_reminders_bulk(reminders)
                     self.refresh()
                     self.window.show_toast(f"Imported {count} reminders!")
                 except Exception as e:
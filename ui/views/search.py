@@ -1,14 +1,20 @@
 import threading
 import requests
-import json
-import os
 from gi.repository import GLib, Gtk, Adw
 
+import net
+from models import Plant
+from .search_cache import SearchCache
+
 DEFAULT_TOKEN = "YOUR_TREFLE_API_TOKEN"
 
+# Provider results shown per search, at most
+MAX_RESULTS = 300
+
 class SearchView:
-    def __init__(self, app_config, builder, on_plant_selected_callback):
+    def __init__(self, app_config, catalog, builder, on_plant_selected_callback):
         self.config = app_config
+        self.catalog = catalog
         self.on_plant_selected = on_plant_selected_callback
         
         self.stack = builder.search_stack
@@ -17,6 +23,26 @@ class SearchView:
         self.spinner = builder.search_spinner
         
         self.search_timeout_id = None
+        self.results_cache = SearchCache()
+
+        # Bumped for every search; results from older ones are dropped
+        self.generation = 0
+        self.cancel_token = None
+
+        # Paging of the current provider search. more is (provider, key,
+        # query, next page) while the provider has pages left; the page
+        # after the shown ones is fetched ahead into prefetched.
+        self.more = None
+        self.prefetched = None
+        self.fetching = False
+        self.shown = 0
+
+        # Show the next page once the user is within a viewport of the end
+        scrolled = self.result_list.get_ancestor(Gtk.ScrolledWindow)
+        self.adjustment = scrolled.get_vadjustment() if scrolled else None
+        if self.adjustment:
+            self.adjustment.connect("value-changed", self._on_adjustment_changed)
+            self.adjustment.connect("changed", self._on_adjustment_changed)
 
         # Connect signals
         self.entry.connect("activate", self._on_search_triggered)
@@ -29,15 +55,20 @@ class SearchView:
 
     def _on_search_changed(self, entry):
         text = entry.get_text()
+        self._cancel_live_search()
         if not text:
+            self._supersede()
             self.stack.set_visible_child_name("empty_search")
             self._clear_results()
             return
             
+        self.search_timeout_id = GLib.timeout_add(400, self._trigger_live_search, text)
+
+    def _cancel_live_search(self):
+        """Drops a live search that is still waiting for typing to pause."""
         if self.search_timeout_id:
             GLib.source_remove(self.search_timeout_id)
-            
-        self.search_timeout_id = GLib.timeout_add(400, self._trigger_live_search, text)
+            self.search_timeout_id = None
 
     def _trigger_live_search(self, query):
         self.search_timeout_id = None
@@ -47,46 +78,31 @@ class SearchView:
     def _on_search_triggered(self, entry):
         query = entry.get_text()
         if query:
-            if self.search_timeout_id:
-                GLib.source_remove(self.search_timeout_id)
-                self.search_timeout_id = None
+            self._cancel_live_search()
             self._perform_search(query)
 
     def _perform_search(self, query):
         self.stack.set_visible_child_name("loading")
-        threading.Thread(target=self._fetch_plants, args=(query,), daemon=True).start()
+        generation, cancel = self._supersede()
+        threading.Thread(target=self._fetch_plants, args=(query, generation, cancel), daemon=True).start()
+
+    def _supersede(self):
+        """Cancels the search in flight, if any. Returns the next search's generation and token."""
+        if self.cancel_token:
+            self.cancel_token.cancel()
+        self.generation += 1
+        self.cancel_token = net.CancelToken()
+        self.more = None
+        self.prefetched = None
+        self.fetching = False
+        self.shown = 0
+        return self.generation, self.cancel_token
 
     def _search_local_plants(self, query):
-        try:
-            # Locate plants.json relative to this file
-            base_path = os.path.dirname(os.path.abspath(__file__))
-            # search.py is in ui/views, so we need to go up two levels to reach root
-            json_path = os.path.join(base_path, "../../plants.json")
-            
-            if not os.path.exists(json_path):
-                # Fallback: check current directory (useful for testing)
-                if os.path.exists("plants.json"):
-                    json_path = "plants.json"
-                
-            if os.path.exists(json_path):
-                with open(json_path, 'r') as f:
-                    data = json.load(f).get('data', [])
-                    
-                query_lower = query.lower()
-                results = [
-                    p for p in data 
-                    if query_lower in (p.get('common_name') or "").lower() 
-                    or query_lower in (p.get('scientific_name') or "").lower()
-                ]
-                return results
-            else:
-                print(f"plants.json not found at {json_path}")
-                return []
-        except Exception as e:
-            print(f"Local search error: {e}")
-            return []
+        # Served from the in-memory catalog; runs on the search thread
+        return self.catalog.search(query)
 
-    def _fetch_plants(self, query):
+    def _fetch_plants(self, query, generation, cancel):
         try:
             token = self.config.get("api_key")
             provider = self.config.get("api_provider", "trefle")
@@ -94,83 +110,176 @@ class SearchView:
             # Check for valid API key
             if not token or token == DEFAULT_TOKEN:
                 data = self._search_local_plants(query)
-                GLib.idle_add(self._populate_results, data)
+                GLib.idle_add(self._populate_results, data, generation)
                 return
             
-            data = []
-            
-            if provider == "perenual":
-                url = f"https://perenual.com/api/v2/species-list?key={token}&q={query}"
-                res = requests.get(url, timeout=10)
-                
-                if res.status_code == 200:
-                    json_data = res.json().get('data', [])
-                    
-                    # Normalize Perenual data to match Trefle structure partially
-                    # Perenual returns 'scientific_name' as list, Trefle as string
-                    # Perenual returns 'default_image' dict, Trefle 'image_url' string
-                    for item in json_data:
-                        # Perenual scientific_name is a list
-                        sci_name = item.get('scientific_name', [])
-                        if isinstance(sci_name, list):
-                            sci_name = sci_name[0] if sci_name else "Unknown"
-                            
-                        # Handle image
-                        img_url = None
-                        default_img = item.get('default_image')
-                        if default_img and isinstance(default_img, dict):
-                            img_url = default_img.get('regular_url')
-                            
-                        data.append({
-                            'id': item.get('id'), # Note: IDs might collide if mixing providers in DB
-                            'common_name': item.get('common_name'),
-                            'scientific_name': sci_name,
-                            'image_url': img_url,
-                            'family': item.get('family'), # Might be null in list view
-                            'year': item.get('year'), # Not usually in list view
-                            'bibliography': None,
-                            # Extra fields that might be useful if we fetch details
-                            'cycle': item.get('cycle'),
-                            'watering': item.get('watering'),
-                            'sunlight': item.get('sunlight')
-                        })
-                elif res.status_code == 401:
-                     data = self._search_local_plants(query)
+            cached = self.results_cache.get(provider, query)
+            if cached is not None:
+                data, complete = cached
+                # An incomplete entry holds the first page only
+                more = None if complete else (provider, token, query, 2)
+                GLib.idle_add(self._populate_results, data, generation, more)
+                return
+
+            page = self._fetch_page(provider, token, query, 1, cancel)
+            if page is None:
+                data, more = self._search_local_plants(query), None
             else:
-                # Default to Trefle
-                url = f"https://trefle.io/api/v1/plants/search?token={token}&q={query}"
-                res = requests.get(url, timeout=10)
-                if res.status_code == 200:
-                    data = res.json().get('data', [])
-                elif res.status_code == 401:
-                     data = self._search_local_plants(query)
-                else:
-                     print(f"API Error {res.status_code}")
-                
-            GLib.idle_add(self._populate_results, data)
+                data, has_more = page
+                self.results_cache.put(provider, query, data, not has_more)
+                more = (provider, token, query, 2) if has_more else None
+            GLib.idle_add(self._populate_results, data, generation, more)
+        except net.Cancelled:
+            pass
         except Exception as e:
             print(f"Search error: {e}")
-            # Optional: GLib.idle_add to show an error toast/state
+            # Nothing was cached, so retyping the query tries again
+            GLib.idle_add(self._populate_results, [], generation)
+
+    def _fetch_page(self, provider, token, query, page, cancel):
+        """
+        Returns (results, has_more) for one page of a provider search, or
+        None if the provider refused the key. Raises HTTPError for any
+        other failure, so it isn't mistaken for (and cached as) no results.
+        Runs on a worker thread.
+        """
+        if provider == "perenual":
+            res = net.get(
+                "https://perenual.com/api/v2/species-list",
+                params={"key": token, "q": query, "page": page}, cancel=cancel
+            )
+            if res.status_code == 200:
+                body = res.json()
+                data = [self._from_perenual(item) for item in body.get('data', [])]
+                return data, body.get('current_page', page) < body.get('last_page', page)
+        else:
+            # Default to Trefle
+            res = net.get(
+                "https://trefle.io/api/v1/plants/search",
+                params={"token": token, "q": query, "page": page}, cancel=cancel
+            )
+            if res.status_code == 200:
+                body = res.json()
+                return body.get('data', []), bool(body.get('links', {}).get('next'))
 
-    def _populate_results(self, data):
+        if res.status_code == 401:
+            return None
+        raise requests.HTTPError(f"API Error {res.status_code}", response=res)
+
+    def _from_perenual(self, item):
+        # Normalize Perenual data to match Trefle structure partially
+        # Perenual returns 'scientific_name' as list, Trefle as string
+        # Perenual returns 'default_image' dict, Trefle 'image_url' string
+        sci_name = item.get('scientific_name', [])
+        if isinstance(sci_name, list):
+            sci_name = sci_name[0] if sci_name else "Unknown"
+            
+        # Handle image
+        img_url = None
+        default_img = item.get('default_image')
+        if default_img and isinstance(default_img, dict):
+            img_url = default_img.get('regular_url')
+            
+        return {
+            'id': item.get('id'), # Note: IDs might collide if mixing providers in DB
+            'common_name': item.get('common_name'),
+            'scientific_name': sci_name,
+            'image_url': img_url,
+            'family': item.get('family'), # Might be null in list view
+            'year': item.get('year'), # Not usually in list view
+            'bibliography': None,
+            # Extra fields that might be useful if we fetch details
+            'cycle': item.get('cycle'),
+            'watering': item.get('watering'),
+            'sunlight': item.get('sunlight'),
+            'synonyms': item.get('other_name')
+        }
+
+    def _populate_results(self, data, generation, more=None):
+        if generation != self.generation:
+            return False  # A newer search has started since
         self._clear_results()
         if not data:
             self.stack.set_visible_child_name("empty_search")
-            return
+            return False
         
         self.stack.set_visible_child_name("results")
-        for plant in data:
+        self.shown = 0
+        self._append_rows(data)
+        self.more = more
+        self._prefetch()
+        return False
+
+    def _append_rows(self, data):
+        for plant in data[:MAX_RESULTS - self.shown]:
             common = plant.get('common_name')
             scientific = plant.get('scientific_name')
             
             row = Adw.ActionRow(title=common or scientific)
             row.set_subtitle(scientific if common else "")
             row.set_activatable(True)
-            # Store raw data on the row object to retrieve later
-            row.plant_info = plant 
+            # Store the plant on the row object to retrieve later
+            row.plant_info = Plant.from_api(plant)
             self.result_list.append(row)
+            self.shown += 1
+
+    # --- Paging ---
+
+    def _prefetch(self):
+        """Fetches the page after the shown ones, unless it's already here or on its way."""
+        if self.more is None or self.fetching or self.prefetched is not None:
+            return
+        if self.shown >= MAX_RESULTS:
+            self.more = None
+            return
+        self.fetching = True
+        threading.Thread(
+            target=self._fetch_next_page, args=(self.more, self.generation, self.cancel_token), daemon=True
+        ).start()
+
+    def _fetch_next_page(self, more, generation, cancel):
+        provider, token, query, page = more
+        try:
+            result = self._fetch_page(provider, token, query, page, cancel) or ([], False)
+        except net.Cancelled:
+            return
+        except Exception as e:
+            print(f"Search error: {e}")
+            result = ([], False)
+        GLib.idle_add(self._on_page_fetched, result, more, generation)
+
+    def _on_page_fetched(self, result, more, generation):
+        if generation != self.generation:
+            return False  # Superseded by a new search
+        data, has_more = result
+        provider, token, query, page = more
+        self.fetching = False
+        self.prefetched = data
+        self.more = (provider, token, query, page + 1) if has_more else None
+        if self._near_end():
+            self._show_prefetched()
         return False
 
+    def _show_prefetched(self):
+        if self.prefetched is None:
+            self._prefetch()
+            return
+        data, self.prefetched = self.prefetched, None
+        self._append_rows(data)
+        # Stay one page ahead
+        self._prefetch()
+
+    def _near_end(self):
+        adjustment = self.adjustment
+        if adjustment is None or adjustment.get_page_size() == 0:
+            return False  # Not allocated yet, e.g. on a hidden stack page
+        remaining = adjustment.get_upper() - adjustment.get_value() - adjustment.get_page_size()
+        return remaining <= adjustment.get_page_size()
+
+    def _on_adjustment_changed(self, adjustment):
+        if self.stack.get_visible_child_name() == "results" and self._near_end():
+            self._show_prefetched()
+
     def _on_row_clicked(self, listbox, row):
         if hasattr(row, 'plant_info'):
             self.on_plant_selected(row.plant_info)
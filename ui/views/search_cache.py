@@ -0,0 +1,69 @@
+import threading
+import time
+from collections import OrderedDict
+
+from catalog import normalize, plant_names
+
+class SearchCache:
+    """
+    Recent provider search results, keyed by (provider, query).
+
+    Entries expire after ttl seconds; beyond max_entries the least recently
+    used is dropped. A result set is complete when the provider returned
+    every match in one response. Since a longer query can only match a
+    subset of a shorter one, a query that extends a cached complete query
+    is answered by filtering that entry locally instead of asking the
+    provider again.
+    """
+
+    def __init__(self, max_entries=64, ttl=600):
+        self.max_entries = max_entries
+        self.ttl = ttl
+        self._entries = OrderedDict()  # (provider, query) -> (expires, results, complete)
+        self._lock = threading.Lock()
+
+    def get(self, provider, query):
+        """(results, complete) cached or locally refined for query, or None."""
+        query = normalize(query)
+        now = time.monotonic()
+        with self._lock:
+            entry = self._lookup((provider, query), now)
+            if entry:
+                return entry[1], entry[2]
+
+            # Longest cached prefix first: the smallest set to filter
+            for end in range(len(query) - 1, 0, -1):
+                entry = self._lookup((provider, query[:end]), now)
+                if entry and entry[2]:
+                    results = [p for p in entry[1] if _matches(p, query)]
+                    self._store((provider, query), results, True, now)
+                    return results, True
+        return None
+
+    def put(self, provider, query, results, complete):
+        with self._lock:
+            self._store((provider, normalize(query)), results, complete, time.monotonic())
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+
+    def _lookup(self, key, now):
+        entry = self._entries.get(key)
+        if entry is None:
+            return None
+        if entry[0] <= now:
+            del self._entries[key]
+            return None
+        self._entries.move_to_end(key)
+        return entry
+
+    def _store(self, key, results, complete, now):
+        self._entries[key] = (now + self.ttl, results, complete)
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+
+def _matches(plant, query):
+    # Providers match on names, so keep results with query in any of them
+    return any(query in name for rank, name in plant_names(plant))
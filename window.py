@@ -6,6 +6,8 @@ gi.require_version('Adw', '1')
 from gi.repository import Gtk, Adw, Gdk
 
 from database import Database
+from catalog import Catalog
+from maintenance import MaintenanceScheduler
 
 # Import our new Modular Views
 from ui.views import (
@@ -101,6 +103,7 @@ class PlantWindow(Adw.ApplicationWindow):
     # Journal
     journal_stack = Gtk.Template.Child()
     journal_list = Gtk.Template.Child()
+    journal_search_entry = Gtk.Template.Child()
     journal_new_btn = Gtk.Template.Child()
     journal_empty_add_btn = Gtk.Template.Child()
     
@@ -149,6 +152,11 @@ class PlantWindow(Adw.ApplicationWindow):
     def __init__(self, **kwargs):
         super().__init__(**kwargs)
         self.db = Database()
+        self.maintenance = MaintenanceScheduler(self.db)
+
+        # Open (or, in development, parse) the offline catalog in the background
+        self.catalog = Catalog()
+        self.catalog.load_async()
 
         self.setup_css()
         
@@ -164,6 +172,7 @@ class PlantWindow(Adw.ApplicationWindow):
         
         self.search_view = SearchView(
             app_config=self.get_application().config,
+            catalog=self.catalog,
             builder=self,
             on_plant_selected_callback=self.on_plant_selected
         )
@@ -239,6 +248,8 @@ class PlantWindow(Adw.ApplicationWindow):
         # Initial Tab Load
         self.on_tab_changed(self.view_stack, None)
 
+        self.maintenance.start()
+
     def on_get_started(self):
         self.get_application().config["orientation_viewed"] = True
         self.get_application().save_config()
@@ -321,6 +332,14 @@ class PlantWindow(Adw.ApplicationWindow):
         self.split_view.connect("notify::pin-sidebar", self.update_sidebar_close_btn)
         self.update_sidebar_close_btn(self.split_view, None)
 
+        self.connect("close-request", self.on_close_request)
+
+    def on_close_request(self, window):
+        # close() waits for the worker, so the final maintenance runs first
+        self.maintenance.shutdown()
+        self.db.close()
+        return False
+
     def on_sidebar_close_clicked(self, btn):
         self.split_view.set_show_sidebar(False)
 
@@ -329,11 +348,11 @@ class PlantWindow(Adw.ApplicationWindow):
         pinned = split_view.get_pin_sidebar()
         self.sidebar_close_btn.set_visible(collapsed and not pinned)
 
-    def on_plant_selected(self, plant_data):
+    def on_plant_selected(self, plant):
         """
         Callback used by Search and Garden views to navigate to details.
         """
-        self.detail_view.load_plant(plant_data)
+        self.detail_view.load_plant(plant)
 
     def open_journal_editor(self, entry_id=None, title="", content=""):
         self.journal_editor_view.open_entry(entry_id, title, content)